@@ -0,0 +1,64 @@
+"""Micro-benchmark of decoding trackable responses in GeocachingApi._request.
+
+Run from the repository root with: python -m benchmarks.bench_decode
+"""
+import json
+import logging
+import timeit
+
+from geocachingapi.utils import default_json_loads, orjson
+
+_LOGGER = logging.getLogger(__name__)
+
+def trackables_payload(count: int = 50) -> bytes:
+    """Create a /trackables response body like the one requested by GeocachingApi"""
+    trackables = []
+    for index in range(count):
+        code = f"TB{index:05X}"
+        trackables.append({
+            "referenceCode": code,
+            "name": f"Travel bug {index}",
+            "holder": {"referenceCode": f"PR{index:04X}", "username": f"holder{index}"},
+            "trackingNumber": f"{index:06d}",
+            "kilometersTraveled": 1234.5 + index,
+            "milesTraveled": 767.1 + index,
+            "currentGeocacheCode": f"GC{index:05X}",
+            "currentGeocacheName": f"Cache number {index}",
+            "isMissing": False,
+            "type": "Travel Bug Dog Tag",
+            "trackableLogs": [{
+                "referenceCode": f"TL{index:06X}",
+                "owner": {"referenceCode": f"PR{index:04X}", "username": f"logger{index}"},
+                "trackableLogType": {"id": 14, "name": "Dropped Off"},
+                "loggedDate": "2021-06-01T12:34:56.789",
+                "text": "Dropped off in a nice cache near the lake. " * 5,
+            }],
+        })
+    return json.dumps(trackables).encode("utf8")
+
+def baseline(body: bytes) -> None:
+    """Decoding as done before: text decode, stdlib json and an eager debug string"""
+    result = json.loads(body.decode("utf8"))
+    _LOGGER.debug(f'{str(result)}')
+
+def optimized(body: bytes) -> None:
+    """Decoding as done now: pluggable decoder on raw bytes and guarded debug logging"""
+    result = default_json_loads(body)
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(f'{str(result)}')
+
+def main() -> None:
+    """Run the benchmark"""
+    logging.basicConfig(level=logging.INFO)
+    body = trackables_payload()
+    number = 2000
+    print(f"Payload: {len(body)} bytes, decoder: {'orjson' if orjson is not None else 'json'}")
+    results = {}
+    for function in (baseline, optimized):
+        seconds = min(timeit.repeat(lambda: function(body), number=number, repeat=5))
+        results[function.__name__] = seconds / number * 1e6
+        print(f"{function.__name__:>10}: {results[function.__name__]:8.1f} us/response")
+    print(f"   savings: {results['baseline'] - results['optimized']:8.1f} us/response")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Offline benchmark of GeocachingApi.update() against the local mock server.
+
+Run from the repository root with: python -m benchmarks.bench_update [--scenario NAME]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import statistics
+import time
+import tracemalloc
+
+from typing import Dict, List
+
+from geocachingapi import GeocachingApiPool, GeocachingRequestHedger, GeocachingSettings
+from geocachingapi.models import GeocachingApiEnvironment
+
+from .mock_server import MockEndpointFaults, MockGeocachingServer, MockServerConfig
+
+# Scenario name: (accounts, trackables per account)
+SCENARIOS = {
+    "single": (1, 1),
+    "hundred": (1, 100),
+    "ten-thousand": (1, 10000),
+    "accounts": (1000, 10),
+}
+
+def percentile(values: List[float], percent: float) -> float:
+    """Get a percentile of a list of values"""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(percent) - 1]
+
+async def run_scenario(name: str, args: argparse.Namespace) -> Dict[str, float]:
+    """Run all rounds of one scenario and collect its metrics"""
+    accounts, trackables = SCENARIOS[name]
+    config = MockServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        endpoints={
+            "/v1/trackables/{code}/journeys": MockEndpointFaults(
+                slow_rate=args.journey_slow_rate, slow_latency=args.journey_slow_latency
+            ),
+        },
+    )
+    durations = []
+    async with MockGeocachingServer(config) as server:
+        async with GeocachingApiPool(
+            environment=GeocachingApiEnvironment.Staging,
+            environment_settings=server.environment_settings,
+            max_concurrency=args.max_concurrency,
+            hedger=GeocachingRequestHedger() if args.hedge else None,
+        ) as pool:
+            codes = [f"TB{index:05X}" for index in range(trackables)]
+            for account in range(accounts):
+                pool.add_account(f"account-{account}", f"token-{account:08d}", GeocachingSettings(trackables=codes))
+            if args.trace_allocations:
+                tracemalloc.start()
+            started = time.perf_counter()
+            failed = 0
+            for _ in range(args.rounds):
+                async for result in pool.update_all():
+                    durations.append(result.duration)
+                    failed += result.error is not None
+            elapsed = time.perf_counter() - started
+            allocated = tracemalloc.get_traced_memory()[1] if args.trace_allocations else None
+            tracemalloc.stop()
+    return {
+        "scenario": name,
+        "accounts": accounts,
+        "trackables": trackables,
+        "updates": len(durations),
+        "failed_updates": failed,
+        "requests": server.stats.requests,
+        "requests_per_second": server.stats.requests / elapsed,
+        "p50_update_ms": percentile(durations, 50) * 1000,
+        "p99_update_ms": percentile(durations, 99) * 1000,
+        "peak_traced_mb": allocated / 2**20 if allocated is not None else None,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+def main() -> None:
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=list(SCENARIOS), action="append", help="scenario to run, default all")
+    parser.add_argument("--rounds", type=int, default=3, help="update() rounds per account")
+    parser.add_argument("--latency", type=float, default=0.005, help="injected latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--journey-slow-rate", type=float, default=0.0, help="fraction of journey requests in the slow tail")
+    parser.add_argument("--journey-slow-latency", type=float, default=1.0, help="extra latency of slow journey requests in seconds")
+    parser.add_argument("--hedge", action="store_true", help="hedge slow GET requests")
+    parser.add_argument("--max-concurrency", type=int, default=50, help="concurrent account updates")
+    parser.add_argument("--trace-allocations", action="store_true", help="measure peak allocations (slow)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per scenario")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    for name in args.scenario or list(SCENARIOS):
+        metrics = asyncio.run(run_scenario(name, args))
+        if args.json:
+            print(json.dumps(metrics))
+            continue
+        print(f"{name}: {metrics['accounts']} account(s) x {metrics['trackables']} trackable(s)")
+        for key, value in metrics.items():
+            if key in ("scenario", "accounts", "trackables") or value is None:
+                continue
+            print(f"  {key:>20}: {value:,.1f}" if isinstance(value, float) else f"  {key:>20}: {value}")
+
+if __name__ == "__main__":
+    main()
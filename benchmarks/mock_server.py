@@ -0,0 +1,259 @@
+"""Local stand-in for the Geocaching API used by the benchmarks and tests."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import time
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from geocachingapi.models import GeocachingApiEnvironmentSettings
+
+@dataclass
+class MockEndpointFaults:
+    """Class to hold the faults injected into one endpoint, on top of the server wide ones"""
+    latency: float = 0.0
+    error_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_next: int = 0
+    slow_latency: float = 0.0
+    fail_next: int = 0
+
+@dataclass
+class MockServerConfig:
+    """Class to hold the faults injected by the mock server.
+
+    endpoints holds extra faults per route, e.g. "/v1/trackables/{code}/journeys". A slow
+    request takes slow_latency longer; slow_next delays the given number of upcoming
+    requests, and a slow_latency above the client timeout injects timeouts. fail_next
+    answers the given number of upcoming requests with 500. A quota_rate
+    above 0 enforces a token bucket of quota_rate requests per second and quota_burst
+    requests per token, answering requests over quota with 429. unknown_trackables are
+    left out of /trackables responses, like invalid or removed reference codes. Requests
+    with one of the rejected_tokens are answered with 401, like expired tokens.
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    journeys_per_trackable: int = 25
+    logs_per_trackable: int = 25
+    etags: bool = False
+    unknown_trackables: List[str] = field(default_factory=list)
+    rejected_tokens: List[str] = field(default_factory=list)
+    quota_rate: float = 0.0
+    quota_burst: float = 1.0
+    endpoints: Dict[str, MockEndpointFaults] = field(default_factory=dict)
+    seed: Optional[int] = 42
+
+_NO_FAULTS = MockEndpointFaults()
+
+@dataclass
+class MockServerStats:
+    """Class to hold the requests served by the mock server"""
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    unauthorized: int = 0
+    not_modified: int = 0
+    bytes_sent: int = 0
+    per_endpoint: Dict[str, int] = field(default_factory=dict)
+    admitted_at: List[float] = field(default_factory=list)
+
+class MockGeocachingServer:
+    """aiohttp server serving /users/me, /trackables and the journeys and logs of trackables"""
+
+    def __init__(self, config: MockServerConfig = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Initialize mock server, port 0 picks a free port"""
+        self.config = config or MockServerConfig()
+        self.stats = MockServerStats()
+        self.host = host
+        self.port = port
+        self._random = random.Random(self.config.seed)
+        self._quotas: Dict[str, Tuple[float, float]] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def environment_settings(self) -> GeocachingApiEnvironmentSettings:
+        """Environment settings pointing GeocachingApi at this server"""
+        return GeocachingApiEnvironmentSettings(
+            api_scheme="http",
+            api_host=self.host,
+            api_port=self.port,
+            api_base_bath="/v1",
+        )
+
+    async def start(self) -> None:
+        """Start serving"""
+        app = web.Application(middlewares=[self._inject_faults])
+        app.router.add_get("/v1/users/me", self._user)
+        app.router.add_get("/v1/trackables", self._trackables)
+        app.router.add_get("/v1/trackables/{code}/journeys", self._journeys)
+        app.router.add_get("/v1/trackables/{code}/trackablelogs", self._logs)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop serving"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> MockGeocachingServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    @web.middleware
+    async def _inject_faults(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count the request, reject tokens, inject latency, errors and rate limiting, and answer conditional requests"""
+        self.stats.requests += 1
+        endpoint = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.stats.per_endpoint[endpoint] = self.stats.per_endpoint.get(endpoint, 0) + 1
+        if request.headers.get("Authorization", "").replace("Bearer ", "") in self.config.rejected_tokens:
+            self.stats.unauthorized += 1
+            return web.json_response({"message": "Token expired"}, status=401)
+        quota_headers = {}
+        if self.config.quota_rate > 0:
+            remaining, reset = self._take_quota(request.headers.get("Authorization", ""))
+            if reset > 0:
+                self.stats.rate_limited += 1
+                return web.json_response(
+                    {"message": "Quota exceeded"},
+                    status=429,
+                    headers={"x-rate-limit-remaining": "0", "x-rate-limit-reset": f"{reset:.3f}"},
+                )
+            quota_headers["x-rate-limit-remaining"] = str(int(remaining))
+        self.stats.admitted_at.append(time.monotonic())
+        faults = self.config.endpoints.get(endpoint, _NO_FAULTS)
+        delay = self.config.latency + faults.latency + self._random.uniform(0, self.config.jitter)
+        if faults.slow_next > 0:
+            faults.slow_next -= 1
+            delay += faults.slow_latency
+        elif faults.slow_rate > 0 and self._random.random() < faults.slow_rate:
+            delay += faults.slow_latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.config.rate_limit_rate:
+            self.stats.rate_limited += 1
+            return web.json_response(
+                {"message": "Too many requests"},
+                status=429,
+                headers={"x-rate-limit-remaining": "0", "x-rate-limit-reset": str(self.config.retry_after)},
+            )
+        if faults.fail_next > 0:
+            faults.fail_next -= 1
+            self.stats.errors += 1
+            return web.json_response({"message": "Injected error"}, status=500)
+        if self._random.random() < max(self.config.error_rate, faults.error_rate):
+            self.stats.errors += 1
+            return web.json_response({"message": "Injected error"}, status=500)
+        response = await handler(request)
+        response.headers.update(quota_headers)
+        if self.config.etags:
+            etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+            if request.headers.get("If-None-Match") == etag:
+                self.stats.not_modified += 1
+                return web.Response(status=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+        self.stats.bytes_sent += len(response.body)
+        return response
+
+    def _take_quota(self, token: str) -> Tuple[float, float]:
+        """Take one request from the quota of a token, returning the remaining requests and the seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated_at = self._quotas.get(token, (self.config.quota_burst, now))
+        tokens = min(self.config.quota_burst, tokens + (now - updated_at) * self.config.quota_rate)
+        if tokens < 1:
+            self._quotas[token] = (tokens, now)
+            return tokens, (1 - tokens) / self.config.quota_rate
+        self._quotas[token] = (tokens - 1, now)
+        return tokens - 1, 0.0
+
+    async def _user(self, request: web.Request) -> web.Response:
+        token = request.headers.get("Authorization", "")[-8:]
+        return web.json_response({
+            "referenceCode": f"PR{abs(hash(token)) % 0xFFFFF:05X}",
+            "username": f"user-{token}",
+            "findCount": 1234,
+            "hideCount": 12,
+            "favoritePoints": 34,
+            "souvenirCount": 56,
+            "awardedFavoritePoints": 78,
+            "membershipLevelId": 3,
+        })
+
+    async def _trackables(self, request: web.Request) -> web.Response:
+        codes = [
+            code for code in request.query.get("referenceCodes", "").split(",")
+            if code and code not in self.config.unknown_trackables
+        ]
+        skip = int(request.query.get("skip", 0))
+        take = int(request.query.get("take", 50))
+        return web.json_response([self._trackable(code) for code in codes[skip:skip + take]])
+
+    async def _journeys(self, request: web.Request) -> web.Response:
+        code = request.match_info["code"]
+        skip = int(request.query.get("skip", 0))
+        take = int(request.query.get("take", 50))
+        count = self.config.journeys_per_trackable
+        journeys = [self._journey(code, index) for index in range(skip, min(skip + take, count))]
+        return web.json_response(journeys)
+
+    async def _logs(self, request: web.Request) -> web.Response:
+        code = request.match_info["code"]
+        skip = int(request.query.get("skip", 0))
+        take = int(request.query.get("take", 50))
+        count = self.config.logs_per_trackable
+        logs = [self._log(code, index) for index in range(skip, min(skip + take, count))]
+        return web.json_response(logs)
+
+    @staticmethod
+    def _trackable(code: str) -> dict:
+        return {
+            "referenceCode": code,
+            "name": f"Travel bug {code}",
+            "holder": {"referenceCode": "PR1", "username": "holder"},
+            "trackingNumber": code[::-1],
+            "kilometersTraveled": 1234.5,
+            "milesTraveled": 767.1,
+            "currentGeocacheCode": "GC12345",
+            "currentGeocacheName": "Benchmark cache",
+            "isMissing": False,
+            "type": "Travel Bug Dog Tag",
+            "trackableLogs": [{
+                "referenceCode": f"TL{code}",
+                "owner": {"referenceCode": "PR2", "username": "logger"},
+                "trackableLogType": {"id": 14, "name": "Dropped Off"},
+                "loggedDate": "2021-06-01T12:34:56.789",
+                "text": "Dropped off in a nice cache near the lake.",
+            }],
+        }
+
+    @staticmethod
+    def _log(code: str, index: int) -> dict:
+        return {
+            "referenceCode": f"TL{code}{index:04d}",
+            "owner": {"referenceCode": "PR2", "username": "logger"},
+            "trackableLogType": {"id": 14, "name": "Dropped Off"},
+            "loggedDate": (datetime(2021, 6, 1, 12) - timedelta(days=index)).isoformat(),
+            "text": f"Log {index} of {code}.",
+        }
+
+    @staticmethod
+    def _journey(code: str, index: int) -> dict:
+        return {
+            "coordinates": {"latitude": 52.0 + index / 1000, "longitude": 4.0 + index / 1000},
+            "loggedDate": f"2021-{12 - index % 12:02d}-01T12:00:00",
+        }
@@ -1,3 +1,13 @@
 """Python client for connecting to the Geocaching API"""
+from .cache import GeocachingCache, GeocachingMemoryCache, GeocachingSqliteCache
 from .geocachingapi import GeocachingApi
+from .instrumentation import GeocachingMetricsAggregator, GeocachingRequestMetrics
+from .pool import GeocachingApiPool, GeocachingPoolResult
+from .ratelimit import GeocachingRateLimiter
+from .resilience import GeocachingCircuitBreaker, GeocachingRequestHedger
+from .scheduler import GeocachingTrackableScheduler
+from .snapshot import GeocachingSnapshotReader, GeocachingSnapshotRecord, GeocachingSnapshotWriter
+from .spatial import GeocachingCoordinateIndex
+from .store import GeocachingStore
+from .sync import GeocachingApiSync
 from .models import GeocachingSettings, GeocachingStatus, GeocachingApiEnvironment
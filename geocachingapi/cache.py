@@ -0,0 +1,157 @@
+"""Response caches for the Geocaching API."""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .const import CACHE_TTLS
+from .utils import endpoint_template
+
+class GeocachingCache(ABC):
+    """Base class for caching GET responses of the Geocaching API.
+
+    Subclasses implement clear, _get and _set. They are called synchronously from the
+    request path, so they run on the event loop and should return quickly.
+    """
+    ttls: Dict[str, float] = None
+    default_ttl: float = 60
+    hits: Dict[str, int] = None
+    misses: Dict[str, int] = None
+
+    def __init__(self, *, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 60) -> None:
+        """Initialize cache with TTLs in seconds per endpoint template"""
+        self.ttls = dict(CACHE_TTLS)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self.hits = {}
+        self.misses = {}
+
+    @staticmethod
+    def cache_key(token: str, url: str) -> str:
+        """Create the cache key of a request, without storing the token itself"""
+        token_hash = hashlib.sha256(token.encode("utf8")).hexdigest()[:16]
+        return f"{token_hash}:{url}"
+
+    def ttl_for(self, uri: str) -> float:
+        """Get the TTL for a request uri"""
+        return self.ttls.get(endpoint_template(uri), self.default_ttl)
+
+    def get(self, token: str, url: str, uri: str) -> Optional[Any]:
+        """Get a cached response, or None when missing or expired"""
+        endpoint = endpoint_template(uri)
+        value = self._get(self.cache_key(token, url))
+        if value is None:
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+        else:
+            self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+        return value
+
+    def set(self, token: str, url: str, uri: str, value: Any) -> None:
+        """Store a response"""
+        ttl = self.ttl_for(uri)
+        if ttl > 0 and value is not None:
+            self._set(self.cache_key(token, url), value, ttl)
+
+    @property
+    def hit_count(self) -> int:
+        """Total number of cache hits"""
+        return sum(self.hits.values())
+
+    @property
+    def miss_count(self) -> int:
+        """Total number of cache misses"""
+        return sum(self.misses.values())
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all cached responses"""
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Any]:
+        """Get the value stored under a key, or None when missing or expired"""
+
+    @abstractmethod
+    def _set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value under a key for ttl seconds"""
+
+class GeocachingMemoryCache(GeocachingCache):
+    """In-memory LRU cache"""
+    max_entries: int = 1024
+
+    def __init__(self, *, max_entries: int = 1024, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 60) -> None:
+        """Initialize in-memory cache"""
+        super().__init__(ttls=ttls, default_ttl=default_ttl)
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        self._entries.clear()
+
+    def _get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class GeocachingSqliteCache(GeocachingCache):
+    """On-disk cache backed by SQLite, surviving process restarts.
+
+    Every GET reads the database, and every fresh response is written to it, with
+    blocking sqlite3 calls on the event loop. These are small indexed queries on a
+    local file in WAL mode, typically well under a millisecond. On slow or network
+    storage they stall all other requests of the loop; use GeocachingMemoryCache there.
+    """
+
+    def __init__(self, path: str, *, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 60) -> None:
+        """Initialize SQLite cache at path"""
+        super().__init__(ttls=ttls, default_ttl=default_ttl)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        self._connection.commit()
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        self._connection.close()
+
+    def _get(self, key: str) -> Optional[Any]:
+        row = self._connection.execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: Any, ttl: float) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, json.dumps(value)),
+            )
+            self._connection.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
@@ -0,0 +1,153 @@
+"""Compact Geocaching models that decode their raw API payload lazily."""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .utils import parse_datetime, parse_float
+
+class _LazyField:
+    """Descriptor decoding one field of the raw payload on first access"""
+    __slots__ = ("key", "decode", "_slot")
+
+    def __init__(self, key: str, decode: Optional[Callable[[Any], Any]] = None) -> None:
+        """Initialize field for a payload key with an optional decode function"""
+        self.key = key
+        self.decode = decode
+        self._slot = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._slot = owner.__dict__[f"_{name}"]
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        try:
+            return self._slot.__get__(instance, owner)
+        except AttributeError:
+            value = instance._data.get(self.key)
+            if value is not None and self.decode is not None:
+                value = self.decode(value)
+            self._slot.__set__(instance, value)
+            return value
+
+def _lazy_slots(*names: str) -> Tuple[str, ...]:
+    """Create the slots caching the decoded values of lazy fields"""
+    return tuple(f"_{name}" for name in names)
+
+class _GeocachingCompactModel:
+    """Base class for models holding their raw API payload"""
+    __slots__ = ("_data",)
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, *, data: Optional[Dict[str, Any]] = None) -> None:
+        """Initialize model from a raw API payload"""
+        self._data = data if data is not None else {}
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The raw API payload"""
+        return self._data
+
+    def update_from_dict(self, data: Dict[str, Any]) -> None:
+        """Merge a new API payload like the regular models do, discarding previously decoded values.
+
+        A null value keeps the previous value and a missing key clears it.
+        """
+        self._data = {key: self._data.get(key) if value is None else value for key, value in data.items()}
+        for name in self._fields:
+            try:
+                delattr(self, f"_{name}")
+            except AttributeError:
+                pass
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Decode all fields into a dict"""
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and other._data == self._data
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()})"
+
+class GeocachingCompactUser(_GeocachingCompactModel):
+    """Compact variant of GeocachingUser"""
+    _fields = (
+        "reference_code", "username", "find_count", "hide_count", "favorite_points",
+        "souvenir_count", "awarded_favorite_points", "membership_level_id",
+    )
+    __slots__ = _lazy_slots(*_fields)
+    reference_code = _LazyField("referenceCode")
+    username = _LazyField("username")
+    find_count = _LazyField("findCount")
+    hide_count = _LazyField("hideCount")
+    favorite_points = _LazyField("favoritePoints")
+    souvenir_count = _LazyField("souvenirCount")
+    awarded_favorite_points = _LazyField("awardedFavoritePoints")
+    membership_level_id = _LazyField("membershipLevelId")
+
+class GeocachingCompactCoordinate(_GeocachingCompactModel):
+    """Compact variant of GeocachingCoordinate with numeric latitude and longitude"""
+    _fields = ("latitude", "longitude")
+    __slots__ = _lazy_slots(*_fields)
+    latitude = _LazyField("latitude", parse_float)
+    longitude = _LazyField("longitude", parse_float)
+
+class GeocachingCompactTrackableJourney(_GeocachingCompactModel):
+    """Compact variant of GeocachingTrackableJourney"""
+    _fields = ("coordinates", "logged_date")
+    __slots__ = _lazy_slots(*_fields)
+    coordinates = _LazyField("coordinates", lambda data: GeocachingCompactCoordinate(data=data))
+    logged_date = _LazyField("loggedDate", parse_datetime)
+
+class GeocachingCompactTrackableLog(_GeocachingCompactModel):
+    """Compact variant of GeocachingTrackableLog"""
+    _fields = ("reference_code", "owner", "text", "log_type", "logged_date")
+    __slots__ = _lazy_slots(*_fields)
+    reference_code = _LazyField("referenceCode")
+    owner = _LazyField("owner", lambda data: GeocachingCompactUser(data=data))
+    text = _LazyField("text")
+    log_type = _LazyField("trackableLogType", lambda data: data.get("name"))
+    logged_date = _LazyField("loggedDate", parse_datetime)
+
+class GeocachingCompactTrackable(_GeocachingCompactModel):
+    """Compact variant of GeocachingTrackable"""
+    _fields = (
+        "reference_code", "name", "holder", "tracking_number", "kilometers_traveled",
+        "miles_traveled", "current_geocache_code", "current_geocache_name", "is_missing",
+        "trackable_type", "latest_log",
+    )
+    __slots__ = _lazy_slots(*_fields) + ("latest_journey",)
+    reference_code = _LazyField("referenceCode")
+    name = _LazyField("name")
+    holder = _LazyField("holder", lambda data: GeocachingCompactUser(data=data))
+    tracking_number = _LazyField("trackingNumber")
+    kilometers_traveled = _LazyField("kilometersTraveled")
+    miles_traveled = _LazyField("milesTraveled")
+    current_geocache_code = _LazyField("currentGeocacheCode")
+    current_geocache_name = _LazyField("currentGeocacheName")
+    is_missing = _LazyField("isMissing")
+    trackable_type = _LazyField("type")
+    latest_log = _LazyField(
+        "trackableLogs", lambda logs: GeocachingCompactTrackableLog(data=logs[0]) if len(logs) > 0 else None
+    )
+
+    def __init__(self, *, data: Optional[Dict[str, Any]] = None) -> None:
+        """Initialize trackable from a raw API payload"""
+        super().__init__(data=data)
+        self.latest_journey = None
+
+    def update_from_dict(self, data: Dict[str, Any]) -> None:
+        """Merge a new API payload; a null holder clears it and a payload without logs keeps the latest log"""
+        logs = data.get("trackableLogs") or self._data.get("trackableLogs")
+        super().update_from_dict(data)
+        if "holder" in data:
+            self._data["holder"] = data["holder"]
+        if logs:
+            self._data["trackableLogs"] = logs
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Decode all fields into a dict"""
+        return {**super().as_dict(), "latest_journey": self.latest_journey}
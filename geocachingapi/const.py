@@ -23,3 +23,28 @@ MEMBERSHIP_LEVELS = {
     2: "Charter",
     3: "Premium"
 }
+
+# Maximum number of reference codes sent in one /trackables request
+TRACKABLE_BATCH_SIZE = 50
+
+# Maximum number of items the API returns per page
+MAX_PAGE_SIZE = 50
+
+# Default time to live in seconds of cached responses per endpoint template
+CACHE_TTLS = {
+    "/users/me": 300,
+    "/trackables": 300,
+    "/trackables/{code}/journeys": 600,
+}
+
+# Seconds to wait after a 429 response without rate limit headers
+DEFAULT_RATE_LIMIT_RETRY_AFTER = 60
+
+# Seconds before token expiry at which the token is refreshed
+TOKEN_REFRESH_MARGIN = 60
+
+# Connection pool settings of sessions created by GeocachingApi
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 20
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
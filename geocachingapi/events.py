@@ -0,0 +1,98 @@
+"""Change events emitted by GeocachingStatus."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from .models import GeocachingTrackableJourney, GeocachingTrackableLog
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass
+class GeocachingEvent:
+    """Base class for status change events"""
+
+@dataclass
+class GeocachingUserFieldChanged(GeocachingEvent):
+    """A field of the user changed, e.g. find_count"""
+    field_name: str
+    old_value: Any
+    new_value: Any
+
+@dataclass
+class GeocachingTrackableAdded(GeocachingEvent):
+    """A trackable appeared in the status for the first time"""
+    reference_code: str
+
+@dataclass
+class GeocachingTrackableMoved(GeocachingEvent):
+    """A trackable moved to another geocache, or out of one"""
+    reference_code: str
+    old_geocache_code: Optional[str]
+    new_geocache_code: Optional[str]
+    new_geocache_name: Optional[str]
+
+@dataclass
+class GeocachingTrackableLogged(GeocachingEvent):
+    """A trackable has a new latest log"""
+    reference_code: str
+    log: GeocachingTrackableLog
+
+@dataclass
+class GeocachingTrackableJourneyChanged(GeocachingEvent):
+    """A trackable has a new latest journey"""
+    reference_code: str
+    journey: Optional[GeocachingTrackableJourney]
+
+@dataclass
+class GeocachingTrackableMissingChanged(GeocachingEvent):
+    """A trackable was marked missing, or found again"""
+    reference_code: str
+    is_missing: bool
+
+_CLOSED = object()
+
+class GeocachingSubscription:
+    """Async iterator over the events of a status, created by GeocachingStatus.subscribe"""
+
+    def __init__(self, unsubscribe: Callable[[GeocachingSubscription], None], maxsize: int = 0) -> None:
+        """Initialize subscription, keeping at most maxsize undelivered events when maxsize > 0"""
+        self._unsubscribe = unsubscribe
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._closed = False
+        self.dropped = 0
+
+    def publish(self, event: GeocachingEvent) -> None:
+        """Queue an event, dropping it when the subscriber is too far behind"""
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            _LOGGER.warning(f'Subscriber queue full, dropped {type(event).__name__}.')
+
+    def close(self) -> None:
+        """Stop receiving events, ending the iteration after queued events. Closing again does nothing"""
+        if self._closed:
+            return
+        self._closed = True
+        self._unsubscribe(self)
+        try:
+            # Wake a waiting iteration; a full queue has none, it ends once drained
+            self._queue.put_nowait(_CLOSED)
+        except asyncio.QueueFull:
+            pass
+
+    def __aiter__(self) -> GeocachingSubscription:
+        return self
+
+    async def __anext__(self) -> GeocachingEvent:
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is _CLOSED:
+            raise StopAsyncIteration
+        return event
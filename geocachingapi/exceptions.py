@@ -14,4 +14,12 @@ class GeocachingApiConnectionTimeoutError(GeocachingApiConnectionError):
 
 class GeocachingApiRateLimitError(GeocachingApiConnectionError):
     """GeocachingApi Rate Limit exception."""
-    
\ No newline at end of file
+
+    def __init__(self, message: str, retry_after: float = None) -> None:
+        """Initialize exception with the number of seconds to wait before retrying."""
+        super().__init__(message)
+        self.retry_after = retry_after
+    
+
+class GeocachingApiCircuitOpenError(GeocachingApiError):
+    """GeocachingApi circuit breaker open exception."""
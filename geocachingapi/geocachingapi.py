@@ -2,17 +2,27 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import socket
+import time
 import async_timeout
 import backoff
 
 from yarl import URL
-from aiohttp import ClientResponse, ClientSession, ClientError
+from aiohttp import ClientResponse, ClientSession, ClientError, TCPConnector, TraceConfig
 
-from typing import Any, Awaitable, Callable, Dict, List, Optional
-from .const import ENVIRONMENT_SETTINGS
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from .cache import GeocachingCache
+from .const import (
+    CONNECTION_LIMIT,
+    CONNECTION_LIMIT_PER_HOST,
+    DNS_CACHE_TTL,
+    ENVIRONMENT_SETTINGS,
+    KEEPALIVE_TIMEOUT,
+    MAX_PAGE_SIZE,
+    TOKEN_REFRESH_MARGIN,
+    TRACKABLE_BATCH_SIZE,
+)
 from .exceptions import (
     GeocachingApiConnectionError,
     GeocachingApiConnectionTimeoutError,
@@ -20,13 +30,31 @@ from .exceptions import (
     GeocachingApiRateLimitError,
 )
 
+from .instrumentation import (
+    GeocachingMetricsCallback,
+    GeocachingRequestAttempt,
+    GeocachingRequestMetrics,
+    create_trace_config,
+    current_request_metrics,
+    on_backoff,
+    on_giveup,
+    track_request,
+)
 from .models import (
+    GeocachingChangeSet,
     GeocachingStatus,
     GeocachingSettings,
     GeocachingApiEnvironment,
     GeocachingApiEnvironmentSettings,
-    GeocachingTrackableJourney
+    GeocachingTrackable,
+    GeocachingTrackableJourney,
+    GeocachingTrackableLog
 )
+from .ratelimit import GeocachingRateLimiter, retry_after, token_key
+from .resilience import GeocachingCircuitBreaker, GeocachingRequestHedger
+from .snapshot import GeocachingSnapshotRecord
+from .scheduler import GeocachingTrackableScheduler
+from .utils import chunk_list, default_json_loads, endpoint_template
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,6 +64,7 @@ class GeocachingApi:
     _status: GeocachingStatus = None
     _settings: GeocachingSettings = None
     _environment_settings: GeocachingApiEnvironmentSettings = None
+    _in_flight: Dict[Tuple[Any, ...], Tuple[asyncio.Future, GeocachingApi]] = {}
     def __init__(
         self,
         *,
@@ -44,35 +73,161 @@ class GeocachingApi:
         settings: GeocachingSettings = None,
         request_timeout: int = 8,
         session: Optional[ClientSession] = None,
-        token_refresh_method: Optional[Callable[[], Awaitable[str]]] = None
-       
+        token_refresh_method: Optional[Callable[[], Awaitable[Union[str, Tuple[str, float]]]]] = None,
+        cache: Optional[GeocachingCache] = None,
+        rate_limit: Optional[float] = None,
+        rate_limit_key: Optional[str] = None,
+        json_loads: Optional[Callable[[bytes], Any]] = None,
+        environment_settings: Optional[GeocachingApiEnvironmentSettings] = None,
+        scheduler: Optional[GeocachingTrackableScheduler] = None,
+        circuit_breaker: Optional[GeocachingCircuitBreaker] = None,
+        hedger: Optional[GeocachingRequestHedger] = None
     ) -> None:
         """Initialize connection with the Geocaching API."""
-        self._environment_settings = ENVIRONMENT_SETTINGS[environment]
-        self._status = GeocachingStatus()
+        self._environment_settings = environment_settings or ENVIRONMENT_SETTINGS[environment]
+        self._base_url = str(URL.build(
+            scheme=self._environment_settings["api_scheme"],
+            host=self._environment_settings["api_host"],
+            port=self._environment_settings["api_port"],
+            path=self._environment_settings["api_base_bath"],
+        ))
         self._settings = settings or GeocachingSettings(False)
+        self._status = GeocachingStatus(compact=self._settings.compact_models, incremental=self._settings.incremental)
         self._session = session
         self.request_timeout = request_timeout
         self.token = token
         self.token_refresh_method = token_refresh_method
+        self._token_expires_at: Optional[float] = None
+        self._token_refreshed = False
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._journey_log_codes: Dict[str, Optional[str]] = {}
+        self._cache = cache
+        self._rate_limiter = None
+        if rate_limit is not None:
+            self._rate_limiter = GeocachingRateLimiter.shared(rate_limit_key or token_key(token), rate_limit)
+        self._json_loads = json_loads or default_json_loads
+        self._metrics_callbacks: List[GeocachingMetricsCallback] = []
+        self._update_task: Optional[asyncio.Future] = None
+        self._scheduler = scheduler
+        self._circuit_breaker = circuit_breaker
+        self._hedger = hedger
+
+    @staticmethod
+    def create_session(
+        *,
+        limit: int = CONNECTION_LIMIT,
+        limit_per_host: int = CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache: int = DNS_CACHE_TTL,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        trace_configs: Optional[List[TraceConfig]] = None,
+    ) -> ClientSession:
+        """Create a client session with a connection pool tuned for the Geocaching API.
+
+        Pass the session to many GeocachingApi instances to share one pool across accounts.
+        """
+        connector = TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            ttl_dns_cache=ttl_dns_cache,
+            keepalive_timeout=keepalive_timeout,
+        )
+        return ClientSession(connector=connector, trace_configs=[create_trace_config(), *(trace_configs or [])])
+
+    def add_metrics_callback(self, callback: GeocachingMetricsCallback) -> None:
+        """Register a callback receiving the metrics of every API call, e.g. a GeocachingMetricsAggregator"""
+        self._metrics_callbacks.append(callback)
+
+    def remove_metrics_callback(self, callback: GeocachingMetricsCallback) -> None:
+        """Unregister a metrics callback"""
+        self._metrics_callbacks.remove(callback)
+
+    async def _request(self, method, uri, conditional: bool = True, **kwargs) -> Any:
+        """Make a request, sharing one response between identical concurrent GET requests.
+
+        In incremental mode a conditional GET request sends the validators of the previous
+        response and returns None when the resource was not modified.
+        """
+        conditional = conditional and method == "GET" and self._settings.incremental
+        if method != "GET" or len(kwargs) > 0:
+            return await self._measured_request(method, uri, conditional, **kwargs)
+        url = self._base_url + uri
+        key = self._coalescing_key(url, conditional)
+        if key in GeocachingApi._in_flight:
+            _LOGGER.debug(f'Joining in-flight request to {uri}.')
+            in_flight, sender = GeocachingApi._in_flight[key]
+        else:
+            in_flight, sender = asyncio.ensure_future(self._measured_request(method, uri, conditional)), self
+            GeocachingApi._in_flight[key] = (in_flight, sender)
+            in_flight.add_done_callback(lambda _: GeocachingApi._in_flight.pop(key, None))
+        result = await asyncio.shield(in_flight)
+        if conditional and sender is not self and url in sender._validators:
+            self._validators[url] = sender._validators[url]
+        return result
+
+    def _coalescing_key(self, url: str, conditional: bool) -> Tuple[Any, ...]:
+        """Key of a GET request, equal only for clients that would send and handle it identically.
+
+        Besides the URL and token this covers the conditional validators, so a 304 is never
+        shared with a client that did not send them, and the client configuration, so a
+        shared response passes the same cache, limits and metrics callbacks.
+        """
+        validators = None
+        if conditional:
+            validators = tuple(sorted(self._validators.get(url, {}).items()))
+        return (
+            asyncio.get_running_loop(),
+            url,
+            self.token,
+            validators,
+            id(self._cache),
+            id(self._circuit_breaker),
+            id(self._hedger),
+            id(self._rate_limiter),
+            self.request_timeout,
+            self._json_loads,
+            tuple(id(callback) for callback in self._metrics_callbacks),
+        )
+
+    async def _measured_request(self, method, uri, conditional: bool, **kwargs) -> Any:
+        """Make a request, recording its metrics when metrics callbacks are registered."""
+        if len(self._metrics_callbacks) == 0:
+            return await self._send_request(method, uri, conditional, **kwargs)
+        metrics = GeocachingRequestMetrics(method, endpoint_template(uri))
+        try:
+            with track_request(metrics):
+                return await self._send_request(method, uri, conditional, **kwargs)
+        except Exception as exception:
+            metrics.error = metrics.error or type(exception).__name__
+            raise
+        finally:
+            metrics.finish()
+            for callback in self._metrics_callbacks:
+                callback(metrics)
 
-    @backoff.on_exception(backoff.expo, GeocachingApiConnectionError, max_tries=3, logger=_LOGGER)
     @backoff.on_exception(
-        backoff.expo, GeocachingApiRateLimitError, base=60, max_tries=6, logger=_LOGGER
+        backoff.expo, GeocachingApiConnectionError, max_tries=3, logger=_LOGGER,
+        on_backoff=on_backoff, on_giveup=on_giveup
     )
-    async def _request(self, method, uri, **kwargs) -> ClientResponse:
-        """Make a request."""
-        if self.token_refresh_method is not None:
-            self.token = await self.token_refresh_method()
-            _LOGGER.debug(f'Token refresh method called.')
+    @backoff.on_exception(
+        backoff.runtime, GeocachingApiRateLimitError, value=lambda exception: exception.retry_after,
+        jitter=None, max_tries=6, logger=_LOGGER, on_backoff=on_backoff, on_giveup=on_giveup
+    )
+    async def _send_request(self, method, uri, conditional: bool, _token_retried: bool = False, **kwargs) -> Any:
+        """Send a request, retrying connection and rate limit errors."""
+        metrics = current_request_metrics()
+        if self.token_refresh_method is not None and self._token_needs_refresh():
+            await self._refresh_token(self.token)
         
-        url = URL.build(
-            scheme=self._environment_settings["api_scheme"],
-            host=self._environment_settings["api_host"],
-            port=self._environment_settings["api_port"],
-            path=self._environment_settings["api_base_bath"],
-        ) 
-        url = str(url) + uri
+        url = self._base_url + uri
+        cacheable = method == "GET" and self._cache is not None
+        if cacheable:
+            cached = self._cache.get(self.token, url, uri)
+            if cached is not None:
+                _LOGGER.debug(f'Cache hit for {url}.')
+                if metrics is not None:
+                    metrics.cache_hit = True
+                return cached
         _LOGGER.debug(f'Executing {method} API request to {url}.')
         headers = kwargs.get("headers")
 
@@ -81,31 +236,91 @@ class GeocachingApi:
         else:
             headers = dict(headers)
 
-        headers["Authorization"] = f"Bearer {self.token}"
-        _LOGGER.debug(f'With headers:')
-        _LOGGER.debug(f'{str(headers)}')
+        request_token = self.token
+        headers["Authorization"] = f"Bearer {request_token}"
+        if conditional and url in self._validators:
+            headers.update(self._validators[url])
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(f'With headers:')
+            _LOGGER.debug(f'{str(headers)}')
         if self._session is None:
-            self._session = ClientSession()
+            self._session = self.create_session()
             _LOGGER.debug(f'New session created.')
             self._close_session = True
 
+        host = self._environment_settings["api_host"]
+        endpoint = endpoint_template(uri)
+        circuit_breaker = self._circuit_breaker
+        if circuit_breaker is not None:
+            circuit_breaker.check(host, endpoint)
+
+        # Outcome for the circuit breaker, None when the request ended without one
+        success = None
         try:
-            with async_timeout.timeout(self.request_timeout):
-                response =  await self._session.request(
+            rate_limiter = self._rate_limiter
+            if rate_limiter is not None:
+                waiting = time.perf_counter()
+                await rate_limiter.acquire()
+                if metrics is not None:
+                    metrics.rate_limit_wait += time.perf_counter() - waiting
+
+            def attempt(trace: Optional[GeocachingRequestAttempt] = None) -> Awaitable[ClientResponse]:
+                return self._session.request(
                     method,
                     f"{url}",
                     **kwargs,
                     headers=headers,
+                    trace_request_ctx=trace or GeocachingRequestAttempt(metrics),
                 )
-        except asyncio.TimeoutError as exception:
-            raise GeocachingApiConnectionTimeoutError(
-                "Timeout occurred while connecting to the Geocaching API"
-            ) from exception
-        except (ClientError, socket.gaierror) as exception:
-            raise GeocachingApiConnectionError(
-                "Error occurred while communicating with the Geocaching API"
-            ) from exception
-        
+
+            async def hedge_attempt() -> ClientResponse:
+                if rate_limiter is None:
+                    return await attempt()
+                await rate_limiter.acquire()
+                trace = GeocachingRequestAttempt(metrics)
+                try:
+                    return await attempt(trace)
+                except asyncio.CancelledError:
+                    if trace.sent is False:
+                        rate_limiter.release()
+                    raise
+
+            try:
+                async with async_timeout.timeout(self.request_timeout):
+                    if self._hedger is not None and method == "GET":
+                        response = await self._hedger.run(endpoint, attempt, hedge_attempt)
+                    else:
+                        response = await attempt()
+            except asyncio.TimeoutError as exception:
+                success = False
+                raise GeocachingApiConnectionTimeoutError(
+                    "Timeout occurred while connecting to the Geocaching API"
+                ) from exception
+            except (ClientError, socket.gaierror) as exception:
+                success = False
+                raise GeocachingApiConnectionError(
+                    "Error occurred while communicating with the Geocaching API"
+                ) from exception
+
+            success = response.status < 500
+        finally:
+            if circuit_breaker is not None:
+                if success is None:
+                    circuit_breaker.release(host, endpoint)
+                else:
+                    circuit_breaker.record(host, endpoint, success)
+
+        if metrics is not None:
+            metrics.status = response.status
+        if rate_limiter is not None:
+            rate_limiter.update_from_headers(response.headers)
+
+        if response.status == 401 and self.token_refresh_method is not None and not _token_retried:
+            response.release()
+            _LOGGER.debug(f'Request to {url} was unauthorized, refreshing token.')
+            await self._refresh_token(request_token, force=True)
+            return await self._send_request(method, uri, conditional, _token_retried=True, **kwargs)
+
         content_type = response.headers.get("Content-Type", "")
         # Error handling
         if (response.status // 100) in [4, 5]:
@@ -113,30 +328,169 @@ class GeocachingApi:
             response.close()
 
             if response.status == 429:
+                if metrics is not None:
+                    metrics.rate_limited = True
+                wait = retry_after(response.headers)
+                if rate_limiter is not None:
+                    rate_limiter.block(wait)
                 raise GeocachingApiRateLimitError(
-                    "Rate limit error has occurred with the Geocaching API"
+                    "Rate limit error has occurred with the Geocaching API", retry_after=wait
                 )
 
             if content_type == "application/json":
-                raise GeocachingApiError(response.status, json.loads(contents.decode("utf8")))
+                raise GeocachingApiError(response.status, self._json_loads(contents))
             raise GeocachingApiError(response.status, {"message": contents.decode("utf8")})
         
+        if conditional:
+            self._store_validators(url, response)
+
+        # Handle unchanged resource
+        if response.status == 304:
+            response.release()
+            _LOGGER.debug(f'Request to {url} resulted in status 304. Resource not modified.')
+            return
+
         # Handle empty response
         if response.status == 204:
             _LOGGER.warning(f'Request to {url} resulted in status 204. Your dataset could be out of date.')
             return
         
+        contents = await response.read()
+        if metrics is not None:
+            metrics.response_size += len(contents)
         if "application/json" in content_type:
-            result =  await response.json()
+            decoding = time.perf_counter()
+            result = self._json_loads(contents)
+            if metrics is not None:
+                metrics.decode_time += time.perf_counter() - decoding
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f'Response:')
+                _LOGGER.debug(f'{str(result)}')
+            if cacheable:
+                self._cache.set(self.token, url, uri, result)
+            return result
+        result = contents.decode(response.get_encoding())
+        if _LOGGER.isEnabledFor(logging.DEBUG):
             _LOGGER.debug(f'Response:')
             _LOGGER.debug(f'{str(result)}')
-            return result
-        result =  await response.text()
-        _LOGGER.debug(f'Response:')
-        _LOGGER.debug(f'{str(result)}')
         return result
 
+    def _token_needs_refresh(self) -> bool:
+        """Check whether the token was never refreshed or is about to expire"""
+        if not self._token_refreshed:
+            return True
+        return self._token_expires_at is not None and time.monotonic() >= self._token_expires_at - TOKEN_REFRESH_MARGIN
+
+    async def _refresh_token(self, stale_token: str, force: bool = False) -> None:
+        """Refresh the token once, letting concurrent callers share the refresh"""
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if self.token != stale_token or (not force and not self._token_needs_refresh()):
+                return
+            result = await self.token_refresh_method()
+            if isinstance(result, tuple):
+                self.token, expires_in = result
+                self._token_expires_at = time.monotonic() + expires_in
+            else:
+                self.token = result
+                self._token_expires_at = None
+            self._token_refreshed = True
+            _LOGGER.debug(f'Token refresh method called.')
+
+    def _store_validators(self, url: str, response: ClientResponse) -> None:
+        """Remember the ETag/Last-Modified validators of a response for conditional requests"""
+        validators = {}
+        if "ETag" in response.headers:
+            validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        if len(validators) > 0:
+            self._validators[url] = validators
+
+    async def _request_paged(self, uri: str, take: int = MAX_PAGE_SIZE, limit: Optional[int] = None) -> List[Any]:
+        """Request all pages of a list endpoint by following skip/take, stopping early at limit items"""
+        results = []
+        async for page in self._iter_pages(uri, take, limit):
+            results.extend(page)
+        return results
+
+    async def _iter_pages(
+        self,
+        uri: str,
+        take: int = MAX_PAGE_SIZE,
+        limit: Optional[int] = None,
+        prefetch: bool = True
+    ) -> AsyncIterator[List[Any]]:
+        """Iterate the pages of a list endpoint.
+
+        With prefetch the next page is fetched while the current one is consumed; without
+        it the next page is only requested when the caller asks for it, so a caller that
+        stops early sends no request it does not use. Pages are requested without
+        validators: a 304 on one page says nothing about the pages after it, and would end
+        the iteration early.
+        """
+        separator = "&" if "?" in uri else "?"
+
+        def request_page(skip: int) -> asyncio.Future:
+            return asyncio.ensure_future(self._request("GET", f"{uri}{separator}skip={skip}&take={take}", conditional=False))
+
+        skip = 0
+        next_page = request_page(skip)
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+                if not page:
+                    return
+                skip += take
+                more = len(page) == take and (limit is None or skip < limit)
+                if more and prefetch:
+                    next_page = request_page(skip)
+                yield page
+                if more and not prefetch:
+                    next_page = request_page(skip)
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def trackable_journeys(
+        self,
+        reference_code: str,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True
+    ) -> AsyncIterator[GeocachingTrackableJourney]:
+        """Iterate all journeys of a trackable, newest first.
+
+        Turn prefetch off when iteration usually stops after the first few journeys.
+        """
+        async for page in self._iter_pages(f"/trackables/{reference_code}/journeys?sort=loggedDate-", page_size, prefetch=prefetch):
+            for data in page:
+                yield self._status.create_journey(data)
+
+    async def trackable_logs(
+        self,
+        reference_code: str,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True
+    ) -> AsyncIterator[GeocachingTrackableLog]:
+        """Iterate all logs of a trackable, newest first.
+
+        Turn prefetch off when iteration usually stops after the first few logs.
+        """
+        async for page in self._iter_pages(f"/trackables/{reference_code}/trackablelogs?sort=loggedDate-", page_size, prefetch=prefetch):
+            for data in page:
+                yield self._status.create_log(data)
+
     async def update(self) -> GeocachingStatus:
+        """Update the status, letting concurrent callers share one refresh"""
+        if self._update_task is None or self._update_task.done():
+            self._update_task = asyncio.ensure_future(self._update())
+        return await asyncio.shield(self._update_task)
+
+    async def _update(self) -> GeocachingStatus:
+        self._status.changes = GeocachingChangeSet()
+        self._status.trackable_errors = {}
         await self._update_user(None)
         if len(self._settings.trackable_codes) > 0:
             await self._update_trackables()
@@ -157,11 +511,16 @@ class GeocachingApi:
                 "membershipLevelId"
             ])
             data = await self._request("GET", f"/users/me?fields={fields}")
+            if data is None:
+                _LOGGER.debug(f'User not modified.')
+                return
         self._status.update_user_from_dict(data)
         _LOGGER.debug(f'User updated.')
     
     async def _update_trackables(self, data: Dict[str, Any] = None) -> None:
         assert self._status
+        semaphore = asyncio.Semaphore(max(1, self._settings.max_concurrency))
+        reference_codes: List[str] = []
         if data is None:
             fields = ",".join([
                 "referenceCode",
@@ -175,22 +534,95 @@ class GeocachingApi:
                 "isMissing",
                 "type"
             ])
-            trackable_parameters = ",".join(self._settings.trackable_codes)
-            data = await self._request("GET", f"/trackables?referenceCodes={trackable_parameters}&fields={fields}&expand=trackablelogs:1")
-        self._status.update_trackables_from_dict(data)
-        if len(self._status.trackables) > 0:
-            for trackable in self._status.trackables.values():
-                latest_journey_data = await self._request("GET",f"/trackables/{trackable.reference_code}/journeys?sort=loggedDate-&take=1")
-                if len(latest_journey_data) == 1:
-                    trackable.latest_journey = GeocachingTrackableJourney(data=latest_journey_data[0])
+            reference_codes = self._settings.trackable_codes
+            if self._scheduler is not None:
+                reference_codes = self._scheduler.due(reference_codes)
+                if len(reference_codes) == 0:
+                    _LOGGER.debug(f'No trackables due for refresh.')
+                    return
+            chunks = list(chunk_list(reference_codes, TRACKABLE_BATCH_SIZE))
+            batches = await asyncio.gather(
+                *[self._request_trackables_batch(codes, fields, semaphore) for codes in chunks],
+                return_exceptions=True
+            )
+            data = []
+            for codes, batch in zip(chunks, batches):
+                if isinstance(batch, Exception):
+                    _LOGGER.warning(f'Updating a batch of {len(codes)} trackables failed: {batch}')
+                    self._status.trackable_errors.update((code, batch) for code in codes)
                 else:
-                    trackable.latest_journey = None
+                    data.extend(batch)
+        self._status.update_trackables_from_dict(data)
+        refreshed = [self._status.trackables[item["referenceCode"]] for item in data]
+        if len(refreshed) > 0:
+            trackables = refreshed
+            if self._settings.incremental:
+                trackables = [trackable for trackable in trackables if not self._journey_is_current(trackable)]
+                _LOGGER.debug(f'{len(refreshed) - len(trackables)} journeys unchanged.')
+            results = await asyncio.gather(
+                *[self._update_latest_journey(trackable, semaphore) for trackable in trackables],
+                return_exceptions=True
+            )
+            for trackable, result in zip(trackables, results):
+                if isinstance(result, Exception):
+                    _LOGGER.warning(f'Updating journey of trackable {trackable.reference_code} failed: {result}')
+                    self._status.trackable_errors[trackable.reference_code] = result
+        if self._scheduler is not None:
+            for trackable in refreshed:
+                self._scheduler.record(trackable)
+            returned = set(item["referenceCode"] for item in data)
+            for reference_code in reference_codes:
+                if reference_code not in returned and reference_code not in self._status.trackable_errors:
+                    self._scheduler.record_missing(reference_code)
 
         _LOGGER.debug(f'Trackables updated.')
 
+    async def _request_trackables_batch(self, codes: List[str], fields: str, semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """Request one batch of trackables"""
+        trackable_parameters = ",".join(codes)
+        async with semaphore:
+            return await self._request_paged(f"/trackables?referenceCodes={trackable_parameters}&fields={fields}&expand=trackablelogs:1", limit=len(codes))
+
+    async def _update_latest_journey(self, trackable: GeocachingTrackable, semaphore: asyncio.Semaphore) -> None:
+        """Update the latest journey of a single trackable"""
+        async with semaphore:
+            latest_journey_data = await self._request("GET",f"/trackables/{trackable.reference_code}/journeys?sort=loggedDate-&take=1")
+        self._journey_log_codes[trackable.reference_code] = self._latest_log_code(trackable)
+        if latest_journey_data is None:
+            return
+        if len(latest_journey_data) == 1:
+            latest_journey = self._status.create_journey(latest_journey_data[0])
+        else:
+            latest_journey = None
+        self._status.update_latest_journey(trackable, latest_journey)
+
+    def _journey_is_current(self, trackable: GeocachingTrackable) -> bool:
+        """Check whether the trackable was not logged since its journey was last fetched"""
+        code = trackable.reference_code
+        return code in self._journey_log_codes and self._journey_log_codes[code] == self._latest_log_code(trackable)
+
+    @staticmethod
+    def _latest_log_code(trackable: GeocachingTrackable) -> Optional[str]:
+        """Get the reference code of the latest log of a trackable"""
+        return trackable.latest_log.reference_code if trackable.latest_log else None
+
+    def restore(self, record: GeocachingSnapshotRecord) -> GeocachingStatus:
+        """Warm-start the status from a snapshot record without fetching it from the API"""
+        record.apply(self._status)
+        for reference_code, trackable in self._status.trackables.items():
+            if trackable.latest_journey is not None:
+                self._journey_log_codes[reference_code] = self._latest_log_code(trackable)
+        return self._status
+
+    @property
+    def settings(self) -> GeocachingSettings:
+        """The current Geocaching settings"""
+        return self._settings
+
     async def update_settings(self, settings: GeocachingSettings):
         """Update the Geocaching settings"""
         self._settings = settings
+        self._status.incremental = settings.incremental
         
     async def close(self) -> None:
         """Close open client session."""
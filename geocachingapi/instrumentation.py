@@ -0,0 +1,204 @@
+"""Request instrumentation for the Geocaching API."""
+from __future__ import annotations
+
+import bisect
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from aiohttp import ClientSession, TraceConfig
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+@dataclass
+class GeocachingRequestMetrics:
+    """Class to hold the measurements of one API call, including its retries"""
+    method: str
+    endpoint: str
+    status: Optional[int] = None
+    duration: float = 0.0
+    connect_time: float = 0.0
+    queue_time: float = 0.0
+    wait_time: float = 0.0
+    decode_time: float = 0.0
+    rate_limit_wait: float = 0.0
+    retry_count: int = 0
+    retry_wait: float = 0.0
+    response_size: int = 0
+    rate_limited: bool = False
+    cache_hit: bool = False
+    error: Optional[str] = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def finish(self) -> None:
+        """Record the total duration of the call"""
+        self.duration = time.perf_counter() - self._started
+
+GeocachingMetricsCallback = Callable[[GeocachingRequestMetrics], None]
+
+@dataclass
+class GeocachingRequestAttempt:
+    """Class to hold the trace state of one attempt of an API call.
+
+    sent stays None when the session does not trace requests. A traced request is
+    not sent until its headers were written.
+    """
+    metrics: Optional[GeocachingRequestMetrics] = None
+    sent: Optional[bool] = None
+
+_current_metrics: ContextVar[Optional[GeocachingRequestMetrics]] = ContextVar("geocaching_request_metrics", default=None)
+
+def current_request_metrics() -> Optional[GeocachingRequestMetrics]:
+    """Get the metrics of the API call running in the current context"""
+    return _current_metrics.get()
+
+@contextmanager
+def track_request(metrics: GeocachingRequestMetrics) -> Iterator[GeocachingRequestMetrics]:
+    """Make metrics the metrics of the API call running in the current context"""
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+def on_backoff(details: Dict[str, Any]) -> None:
+    """Backoff handler counting retries and the time spent sleeping"""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.retry_count += 1
+        metrics.retry_wait += details.get("wait") or 0
+
+def on_giveup(details: Dict[str, Any]) -> None:
+    """Backoff handler recording the error that exhausted the retries"""
+    metrics = _current_metrics.get()
+    if metrics is not None and "exception" in details:
+        metrics.error = type(details["exception"]).__name__
+
+def create_trace_config() -> TraceConfig:
+    """Create an aiohttp TraceConfig measuring queue, connect and wait times.
+
+    GeocachingApi.create_session adds it automatically; add it to your own session
+    to get the latency breakdown for requests made through it.
+    """
+    trace_config = TraceConfig()
+
+    def attempt_metrics(context: SimpleNamespace) -> Optional[GeocachingRequestMetrics]:
+        attempt = context.trace_request_ctx
+        return attempt.metrics if isinstance(attempt, GeocachingRequestAttempt) else None
+
+    async def on_request_start(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+        context.request_started = time.perf_counter()
+        if isinstance(context.trace_request_ctx, GeocachingRequestAttempt):
+            context.trace_request_ctx.sent = False
+
+    async def on_connection_queued_start(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+        context.queued = time.perf_counter()
+
+    async def on_connection_queued_end(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+        metrics = attempt_metrics(context)
+        if metrics is not None:
+            metrics.queue_time += time.perf_counter() - context.queued
+
+    async def on_connection_create_start(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+        context.connecting = time.perf_counter()
+
+    async def on_connection_create_end(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+        metrics = attempt_metrics(context)
+        if metrics is not None:
+            metrics.connect_time += time.perf_counter() - context.connecting
+
+    async def on_request_end(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+        metrics = attempt_metrics(context)
+        if metrics is not None:
+            total = time.perf_counter() - context.request_started
+            setup = getattr(context, "setup_time", 0.0)
+            metrics.wait_time += total - setup
+
+    async def on_request_headers_sent(session: ClientSession, context: SimpleNamespace, params: Any) -> None:
+        context.setup_time = time.perf_counter() - context.request_started
+        if isinstance(context.trace_request_ctx, GeocachingRequestAttempt):
+            context.trace_request_ctx.sent = True
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_queued_start.append(on_connection_queued_start)
+    trace_config.on_connection_queued_end.append(on_connection_queued_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_headers_sent.append(on_request_headers_sent)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+@dataclass
+class _EndpointStatistics:
+    """Class to hold the aggregated metrics of one endpoint"""
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    duration_sum: float = 0.0
+    retries: int = 0
+    rate_limited: int = 0
+    response_bytes: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+class GeocachingMetricsAggregator:
+    """In-memory metrics sink keeping per-endpoint latency histograms.
+
+    Register it with GeocachingApi.add_metrics_callback and call export_prometheus
+    to render the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize aggregator with histogram bucket upper bounds in seconds"""
+        self.buckets = tuple(sorted(buckets))
+        self.endpoints: Dict[Tuple[str, str], _EndpointStatistics] = {}
+
+    def __call__(self, metrics: GeocachingRequestMetrics) -> None:
+        """Add the metrics of one API call"""
+        key = (metrics.method, metrics.endpoint)
+        statistics = self.endpoints.get(key)
+        if statistics is None:
+            statistics = self.endpoints[key] = _EndpointStatistics(bucket_counts=[0] * (len(self.buckets) + 1))
+        statistics.bucket_counts[bisect.bisect_left(self.buckets, metrics.duration)] += 1
+        statistics.count += 1
+        statistics.duration_sum += metrics.duration
+        statistics.retries += metrics.retry_count
+        statistics.rate_limited += metrics.rate_limited
+        statistics.response_bytes += metrics.response_size
+        status = "cache" if metrics.cache_hit else str(metrics.status or metrics.error or "none")
+        statistics.statuses[status] = statistics.statuses.get(status, 0) + 1
+
+    def reset(self) -> None:
+        """Discard all aggregated metrics"""
+        self.endpoints = {}
+
+    def export_prometheus(self, prefix: str = "geocaching_api") -> str:
+        """Render the aggregated metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for (method, endpoint), statistics in self.endpoints.items():
+            labels = f'method="{method}",endpoint="{endpoint}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, statistics.bucket_counts):
+                cumulative += count
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {statistics.count}')
+            lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {statistics.duration_sum}")
+            lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {statistics.count}")
+        for name, attribute in (
+            ("request_retries_total", "retries"),
+            ("rate_limited_total", "rate_limited"),
+            ("response_bytes_total", "response_bytes"),
+        ):
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for (method, endpoint), statistics in self.endpoints.items():
+                lines.append(f'{prefix}_{name}{{method="{method}",endpoint="{endpoint}"}} {getattr(statistics, attribute)}')
+        lines.append(f"# TYPE {prefix}_responses_total counter")
+        for (method, endpoint), statistics in self.endpoints.items():
+            for status, count in statistics.statuses.items():
+                lines.append(f'{prefix}_responses_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -1,11 +1,27 @@
 from __future__ import annotations
 from array import array
 from enum import Enum
-from typing import Any, Dict, Optional, TypedDict
+from typing import Any, Dict, List, Optional, TypedDict
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from .utils import try_get_from_dict
+from .compact import (
+    GeocachingCompactTrackable,
+    GeocachingCompactTrackableJourney,
+    GeocachingCompactTrackableLog,
+    GeocachingCompactUser,
+)
+from .events import (
+    GeocachingEvent,
+    GeocachingSubscription,
+    GeocachingTrackableAdded,
+    GeocachingTrackableJourneyChanged,
+    GeocachingTrackableLogged,
+    GeocachingTrackableMissingChanged,
+    GeocachingTrackableMoved,
+    GeocachingUserFieldChanged,
+)
+from .utils import payload_fingerprint, try_get_from_dict
 
 class GeocachingApiEnvironmentSettings(TypedDict):
     """Class to represent API environment settings"""
@@ -23,10 +39,16 @@ class GeocachingSettings:
     """Class to hold the Geocaching Api settings"""
     trackable_codes: array(str)
     environment: GeocachingApiEnvironment
+    max_concurrency: int
+    incremental: bool
+    compact_models: bool
 
-    def __init__(self, environment:GeocachingApiEnvironment = GeocachingApiEnvironment.Production, trackables:array(str) = [] ) -> None:
+    def __init__(self, environment:GeocachingApiEnvironment = GeocachingApiEnvironment.Production, trackables:array(str) = [], max_concurrency: int = 10, incremental: bool = False, compact_models: bool = False) -> None:
         """Initialize settings"""
         self.trackable_codes = trackables
+        self.max_concurrency = max_concurrency
+        self.incremental = incremental
+        self.compact_models = compact_models
     
     def set_trackables(self, trackables:array(str)):
         self.trackable_codes = trackables
@@ -123,15 +145,15 @@ class GeocachingTrackable:
         self.name = try_get_from_dict(data, "name", self.name)
         if data["holder"] is not None:
             if self.holder is None :
-                holder = GeocachingUser()
-            holder.update_from_dict(data["holder"])
+                self.holder = GeocachingUser()
+            self.holder.update_from_dict(data["holder"])
         else:
-            holder = None
+            self.holder = None
 
         self.tracking_number = try_get_from_dict(data, "trackingNumber", self.tracking_number)
         self.kilometers_traveled = try_get_from_dict(data, "kilometersTraveled", self.kilometers_traveled)
         self.miles_traveled = try_get_from_dict(data, "milesTraveled", self.miles_traveled)
-        self.current_geocache_code = try_get_from_dict(data, "currectGeocacheCode", self.current_geocache_code)
+        self.current_geocache_code = try_get_from_dict(data, "currentGeocacheCode", self.current_geocache_code)
         self.current_geocache_name = try_get_from_dict(data, "currentGeocacheName", self.current_geocache_name)
         self.is_missing = try_get_from_dict(data, "isMissing", self.is_missing)
         self.trackable_type = try_get_from_dict(data, "type", self.trackable_type)
@@ -139,19 +161,81 @@ class GeocachingTrackable:
             self.latest_log = GeocachingTrackableLog(data=data["trackableLogs"][0])
             
 
+@dataclass
+class GeocachingChangeSet:
+    """Class to hold the changes detected during the last update"""
+    user_fields: List[str] = field(default_factory=list)
+    trackables: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether anything changed during the last update"""
+        return len(self.user_fields) > 0 or len(self.trackables) > 0
+
+    def add_trackable(self, reference_code: str) -> None:
+        """Mark a trackable as changed"""
+        if reference_code not in self.trackables:
+            self.trackables.append(reference_code)
+
 class GeocachingStatus:
     """Class to hold all account status information"""
     user: GeocachingUser = None
     trackables: Dict[str, GeocachingTrackable] = None
+    trackable_errors: Dict[str, Exception] = None
+    changes: GeocachingChangeSet = None
+    compact: bool = False
 
-    def __init__(self):
-        """Initialize GeocachingStatus"""
-        self.user = GeocachingUser()
+    def __init__(self, compact: bool = False, incremental: bool = False):
+        """Initialize GeocachingStatus, optionally using the compact lazily decoded models.
+
+        In incremental mode payloads are fingerprinted, so unchanged ones are skipped.
+        """
+        self.compact = compact
+        self.user = GeocachingCompactUser() if compact else GeocachingUser()
         self.trackables = {}
+        self.trackable_errors = {}
+        self.changes = GeocachingChangeSet()
+        self._incremental = incremental
+        self._user_fingerprint: Optional[str] = None
+        self._fingerprints: Dict[str, str] = {}
+        self._subscriptions: List[GeocachingSubscription] = []
+
+    @property
+    def incremental(self) -> bool:
+        """Whether unchanged payloads are detected by fingerprint and skipped"""
+        return self._incremental
+
+    @incremental.setter
+    def incremental(self, incremental: bool) -> None:
+        if incremental != self._incremental:
+            self._user_fingerprint = None
+            self._fingerprints = {}
+        self._incremental = incremental
+
+    def subscribe(self, maxsize: int = 0) -> GeocachingSubscription:
+        """Subscribe to the change events of this status, iterate the result with async for"""
+        subscription = GeocachingSubscription(self._subscriptions.remove, maxsize)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def _emit(self, event: GeocachingEvent) -> None:
+        """Publish an event to all subscribers"""
+        for subscription in self._subscriptions:
+            subscription.publish(event)
 
     def update_user_from_dict(self, data: Dict[str, Any]) -> None:
         """Update user from the API result"""
+        if self._incremental:
+            fingerprint = payload_fingerprint(data)
+            if self._user_fingerprint == fingerprint:
+                return
+            self._user_fingerprint = fingerprint
+        previous = _model_values(self.user)
         self.user.update_from_dict(data)
+        current = _model_values(self.user)
+        self.changes.user_fields = [name for name, value in current.items() if value != previous[name]]
+        for name in self.changes.user_fields:
+            self._emit(GeocachingUserFieldChanged(name, previous[name], current[name]))
     
     def update_trackables_from_dict(self, data: Any) -> None:
         """Update trackables from the API result"""
@@ -159,7 +243,73 @@ class GeocachingStatus:
             pass
         for trackable in data:
             reference_code = trackable["referenceCode"]
+            if self._incremental:
+                fingerprint = payload_fingerprint(trackable)
+                if self._fingerprints.get(reference_code) == fingerprint:
+                    continue
+                self._fingerprints[reference_code] = fingerprint
             if not reference_code in self.trackables.keys():
-                self.trackables[reference_code] = GeocachingTrackable()
-            self.trackables[reference_code].update_from_dict(trackable)
-            
\ No newline at end of file
+                self.trackables[reference_code] = GeocachingCompactTrackable() if self.compact else GeocachingTrackable()
+                self.trackables[reference_code].update_from_dict(trackable)
+                self._emit(GeocachingTrackableAdded(reference_code))
+                self.changes.add_trackable(reference_code)
+            elif self._update_trackable(self.trackables[reference_code], trackable):
+                self.changes.add_trackable(reference_code)
+
+    def _update_trackable(self, trackable: GeocachingTrackable, data: Dict[str, Any]) -> bool:
+        """Update a known trackable, emitting events for what changed and returning whether anything did"""
+        previous = _trackable_state(trackable)
+        geocache_code = trackable.current_geocache_code
+        log_code = trackable.latest_log.reference_code if trackable.latest_log else None
+        is_missing = trackable.is_missing
+        trackable.update_from_dict(data)
+        if trackable.current_geocache_code != geocache_code:
+            self._emit(GeocachingTrackableMoved(
+                trackable.reference_code, geocache_code, trackable.current_geocache_code, trackable.current_geocache_name
+            ))
+        if trackable.latest_log is not None and trackable.latest_log.reference_code != log_code:
+            self._emit(GeocachingTrackableLogged(trackable.reference_code, trackable.latest_log))
+        if bool(trackable.is_missing) != bool(is_missing):
+            self._emit(GeocachingTrackableMissingChanged(trackable.reference_code, bool(trackable.is_missing)))
+        return _trackable_state(trackable) != previous
+
+    def update_latest_journey(self, trackable: GeocachingTrackable, journey: Optional[GeocachingTrackableJourney]) -> None:
+        """Set the latest journey of a trackable when it changed"""
+        if journey == trackable.latest_journey:
+            return
+        trackable.latest_journey = journey
+        self.changes.add_trackable(trackable.reference_code)
+        self._emit(GeocachingTrackableJourneyChanged(trackable.reference_code, journey))
+
+    def create_journey(self, data: Dict[str, Any]) -> GeocachingTrackableJourney:
+        """Create a trackable journey from the API result"""
+        if self.compact:
+            return GeocachingCompactTrackableJourney(data=data)
+        return GeocachingTrackableJourney(data=data)
+
+    def create_log(self, data: Dict[str, Any]) -> GeocachingTrackableLog:
+        """Create a trackable log from the API result"""
+        if self.compact:
+            return GeocachingCompactTrackableLog(data=data)
+        return GeocachingTrackableLog(data=data)
+
+def _trackable_state(trackable: GeocachingTrackable) -> tuple:
+    """Get the values of a regular or compact trackable that an API payload updates"""
+    return (
+        trackable.name,
+        trackable.holder.username if trackable.holder else None,
+        trackable.tracking_number,
+        trackable.kilometers_traveled,
+        trackable.miles_traveled,
+        trackable.current_geocache_code,
+        trackable.current_geocache_name,
+        trackable.is_missing,
+        trackable.trackable_type,
+        trackable.latest_log.reference_code if trackable.latest_log else None,
+    )
+
+def _model_values(model: Any) -> Dict[str, Any]:
+    """Get the field values of a regular or compact model"""
+    if hasattr(model, "as_dict"):
+        return model.as_dict()
+    return asdict(model)
@@ -0,0 +1,158 @@
+"""Class for polling many Geocaching accounts from one process."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from aiohttp import ClientSession
+
+from .geocachingapi import GeocachingApi
+from .models import GeocachingApiEnvironment, GeocachingSettings, GeocachingStatus
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass
+class GeocachingPoolResult:
+    """Class to hold the outcome of one account update"""
+    account_id: str
+    status: Optional[GeocachingStatus] = None
+    error: Optional[Exception] = None
+    duration: Optional[float] = None
+
+class GeocachingApiPool:
+    """Class to schedule updates of many Geocaching accounts"""
+    _close_session: bool = False
+
+    def __init__(
+        self,
+        *,
+        environment: GeocachingApiEnvironment,
+        session: Optional[ClientSession] = None,
+        max_concurrency: int = 50,
+        poll_interval: float = 300,
+        jitter: float = 0.1,
+        **api_options: Any
+    ) -> None:
+        """Initialize pool.
+
+        max_concurrency limits the number of account updates running at once, while
+        GeocachingSettings.max_concurrency limits the requests of a single account.
+        With a rate_limit in api_options every account gets its own limiter, keyed by
+        account id so it survives token refreshes.
+        """
+        self._environment = environment
+        self._session = session
+        self._api_options = api_options
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.jitter = jitter
+        self._apis: Dict[str, GeocachingApi] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def accounts(self) -> Dict[str, GeocachingApi]:
+        """The clients of all accounts in the pool"""
+        return self._apis
+
+    def add_account(
+        self,
+        account_id: str,
+        token: str,
+        settings: GeocachingSettings = None,
+        token_refresh_method: Optional[Callable[[], Awaitable[str]]] = None
+    ) -> GeocachingApi:
+        """Add an account to the pool"""
+        if self._session is None:
+            self._session = GeocachingApi.create_session()
+            self._close_session = True
+        api = GeocachingApi(
+            environment=self._environment,
+            token=token,
+            settings=settings,
+            session=self._session,
+            token_refresh_method=token_refresh_method,
+            **{"rate_limit_key": account_id, **self._api_options}
+        )
+        self.remove_account(account_id)
+        self._apis[account_id] = api
+        if self._queue is not None:
+            self._tasks[account_id] = asyncio.ensure_future(self._poll_account(account_id, api, initial=True))
+        return api
+
+    def remove_account(self, account_id: str) -> None:
+        """Remove an account from the pool"""
+        self._apis.pop(account_id, None)
+        task = self._tasks.pop(account_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def update_all(self) -> AsyncIterator[GeocachingPoolResult]:
+        """Update every account once, yielding results as they complete"""
+        updates = [self._update(account_id, api) for account_id, api in self._apis.items()]
+        for update in asyncio.as_completed(updates):
+            yield await update
+
+    async def poll(self) -> AsyncIterator[GeocachingPoolResult]:
+        """Keep updating all accounts at jittered intervals, yielding results as they complete"""
+        if self._queue is not None:
+            raise RuntimeError("The pool is already polling")
+        self._queue = asyncio.Queue()
+        for account_id, api in self._apis.items():
+            self._tasks[account_id] = asyncio.ensure_future(self._poll_account(account_id, api, initial=True))
+        try:
+            while True:
+                yield await self._queue.get()
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            self._tasks = {}
+            self._queue = None
+
+    async def _poll_account(self, account_id: str, api: GeocachingApi, initial: bool = False) -> None:
+        """Update one account forever, spreading the first update over the whole interval"""
+        delay = random.uniform(0, self.poll_interval) if initial else self._next_delay()
+        while True:
+            await asyncio.sleep(delay)
+            await self._queue.put(await self._update(account_id, api))
+            delay = self._next_delay()
+
+    def _next_delay(self) -> float:
+        """Get the poll interval with random jitter applied"""
+        return self.poll_interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _update(self, account_id: str, api: GeocachingApi) -> GeocachingPoolResult:
+        """Update one account within the global concurrency limit"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                status = await api.update()
+            except Exception as exception:
+                _LOGGER.warning(f'Updating account {account_id} failed: {exception}')
+                return GeocachingPoolResult(account_id, error=exception, duration=time.perf_counter() - started)
+            return GeocachingPoolResult(account_id, status=status, duration=time.perf_counter() - started)
+
+    async def close(self) -> None:
+        """Stop polling and close the shared client session"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks = {}
+        if self._session and self._close_session:
+            await self._session.close()
+            _LOGGER.debug(f'Session closed.')
+
+    async def __aenter__(self) -> GeocachingApiPool:
+        """Async enter."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        await self.close()
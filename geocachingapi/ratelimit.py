@@ -0,0 +1,112 @@
+"""Client-side rate limiting for the Geocaching API."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+import weakref
+
+from typing import Mapping, Optional
+
+from .const import DEFAULT_RATE_LIMIT_RETRY_AFTER
+from .utils import parse_float
+
+_LOGGER = logging.getLogger(__name__)
+
+class GeocachingRateLimiter:
+    """Token bucket admitting requests at a steady rate.
+
+    Shared limiters are registered by key while any client holds them, and dropped
+    from the registry once the last one is gone.
+    """
+    rate: float = None
+    capacity: float = None
+
+    _limiters: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """Initialize bucket with rate in requests per second and a burst capacity"""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def shared(cls, key: str, rate: float, capacity: Optional[float] = None) -> GeocachingRateLimiter:
+        """Get the limiter shared by all clients of the same account key.
+
+        The rate, and the capacity when given, replace those of an existing limiter.
+        """
+        limiter = cls._limiters.get(key)
+        if limiter is None:
+            limiter = cls._limiters[key] = cls(rate, capacity)
+        elif limiter.rate != rate or (capacity is not None and limiter.capacity != capacity):
+            _LOGGER.debug(f'Rate limit of shared limiter changed to {rate} requests per second.')
+            limiter.rate = rate
+            if capacity is not None:
+                limiter.capacity = capacity
+                limiter._tokens = min(limiter._tokens, capacity)
+        return limiter
+
+    @classmethod
+    def for_token(cls, token: str, rate: float, capacity: Optional[float] = None) -> GeocachingRateLimiter:
+        """Get the limiter shared by all clients created with the same token"""
+        return cls.shared(token_key(token), rate, capacity)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent. Waiters are admitted in order"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                delay = self._reserve()
+                if delay <= 0:
+                    return
+                await asyncio.sleep(delay)
+
+    def _reserve(self) -> float:
+        """Take a token when available, otherwise return the time to wait for one"""
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def release(self) -> None:
+        """Give back the token of a request that was never sent"""
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Align the bucket with the rate limit headers of an API response"""
+        remaining = parse_float(headers.get("x-rate-limit-remaining"))
+        if remaining is None:
+            return
+        self._tokens = min(self._tokens, remaining)
+        reset = parse_float(headers.get("x-rate-limit-reset"))
+        if remaining < 1 and reset is not None:
+            self.block(reset)
+
+    def block(self, seconds: float) -> None:
+        """Admit no requests for the given number of seconds"""
+        _LOGGER.debug(f'Rate limit reached, pausing requests for {seconds}s.')
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+def token_key(token: str) -> str:
+    """Get a key identifying a token without holding the token itself"""
+    return hashlib.sha256(token.encode("utf8")).hexdigest()
+
+def retry_after(headers: Mapping[str, str]) -> float:
+    """Get the number of seconds to wait after a rate limited response"""
+    for header in ("Retry-After", "x-rate-limit-reset"):
+        value = parse_float(headers.get(header))
+        if value is not None and value >= 0:
+            return value
+    return DEFAULT_RATE_LIMIT_RETRY_AFTER
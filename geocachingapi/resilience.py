@@ -0,0 +1,212 @@
+"""Circuit breaking and request hedging for the Geocaching API."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from aiohttp import ClientResponse
+
+from .exceptions import GeocachingApiCircuitOpenError
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+@dataclass
+class _Circuit:
+    """Class to hold the state of one circuit"""
+    state: str = CLOSED
+    outcomes: Deque[Tuple[float, bool]] = field(default_factory=deque)
+    opened_at: float = 0.0
+    probes: int = 0
+
+class GeocachingCircuitBreaker:
+    """Class to fail fast on a host and endpoint while its error rate is too high.
+
+    A circuit opens when at least minimum_requests were made within window seconds and
+    failure_rate of them failed. After open_duration seconds it lets half_open_probes
+    requests through; a successful probe closes it, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        minimum_requests: int = 10,
+        window: float = 60,
+        open_duration: float = 30,
+        half_open_probes: int = 1
+    ) -> None:
+        """Initialize circuit breaker"""
+        self.failure_rate = failure_rate
+        self.minimum_requests = minimum_requests
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_probes = half_open_probes
+        self._circuits: Dict[Tuple[str, str], _Circuit] = {}
+
+    def state(self, host: str, endpoint: str) -> str:
+        """Get the state of the circuit of a host and endpoint"""
+        circuit = self._circuits.get((host, endpoint))
+        return circuit.state if circuit is not None else CLOSED
+
+    def check(self, host: str, endpoint: str) -> None:
+        """Raise GeocachingApiCircuitOpenError when a request may not be sent"""
+        circuit = self._circuits.setdefault((host, endpoint), _Circuit())
+        if circuit.state == OPEN:
+            if time.monotonic() - circuit.opened_at < self.open_duration:
+                raise GeocachingApiCircuitOpenError(f"Circuit open for {endpoint} on {host}")
+            circuit.state = HALF_OPEN
+            circuit.probes = 0
+            _LOGGER.debug(f'Circuit half open for {endpoint} on {host}.')
+        if circuit.state == HALF_OPEN:
+            if circuit.probes >= self.half_open_probes:
+                raise GeocachingApiCircuitOpenError(f"Circuit half open for {endpoint} on {host}, probe in progress")
+            circuit.probes += 1
+
+    def record(self, host: str, endpoint: str, success: bool) -> None:
+        """Record the outcome of a request"""
+        circuit = self._circuits.setdefault((host, endpoint), _Circuit())
+        now = time.monotonic()
+        if circuit.state == HALF_OPEN:
+            circuit.outcomes.clear()
+            if success:
+                circuit.state = CLOSED
+                _LOGGER.debug(f'Circuit closed for {endpoint} on {host}.')
+            else:
+                self._open(circuit, host, endpoint, now)
+            return
+        circuit.outcomes.append((now, success))
+        while circuit.outcomes[0][0] < now - self.window:
+            circuit.outcomes.popleft()
+        failures = sum(1 for _, succeeded in circuit.outcomes if not succeeded)
+        if len(circuit.outcomes) >= self.minimum_requests and failures / len(circuit.outcomes) >= self.failure_rate:
+            self._open(circuit, host, endpoint, now)
+
+    def release(self, host: str, endpoint: str) -> None:
+        """Forget a request that ended without an outcome, e.g. when it was cancelled before a response.
+
+        A half-open circuit admits a new probe in its place.
+        """
+        circuit = self._circuits.get((host, endpoint))
+        if circuit is not None and circuit.state == HALF_OPEN and circuit.probes > 0:
+            circuit.probes -= 1
+
+    @staticmethod
+    def _open(circuit: _Circuit, host: str, endpoint: str, now: float) -> None:
+        circuit.state = OPEN
+        circuit.opened_at = now
+        circuit.outcomes.clear()
+        _LOGGER.warning(f'Circuit opened for {endpoint} on {host}.')
+
+class GeocachingRequestHedger:
+    """Class to send a second attempt of an idempotent request that is slower than usual.
+
+    The second attempt starts once the first has been running longer than the given
+    latency percentile of recent requests to the same endpoint; the first response wins.
+    At most budget of the last window requests are hedged, so a brownout cannot double
+    the request rate.
+    """
+
+    def __init__(self, *, percentile: float = 95, min_samples: int = 20, window: int = 200, budget: float = 0.05) -> None:
+        """Initialize hedger"""
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.budget = budget
+        self.hedged = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._outcomes: Deque[bool] = deque()
+        self._hedged_in_window = 0
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Get the latency after which a request to an endpoint is hedged, None until enough samples exist"""
+        latencies = self._latencies.get(endpoint)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))]
+
+    def record(self, endpoint: str, latency: float) -> None:
+        """Record the latency of a completed request"""
+        latencies = self._latencies.get(endpoint)
+        if latencies is None:
+            latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+        latencies.append(latency)
+
+    def _within_budget(self) -> bool:
+        """Check whether hedging one more request keeps the hedged share of recent requests within budget"""
+        return self._hedged_in_window + 1 <= self.budget * (len(self._outcomes) + 1)
+
+    def _count(self, hedged: bool) -> None:
+        """Count a request in the budget window"""
+        if len(self._outcomes) >= self.window:
+            self._hedged_in_window -= self._outcomes.popleft()
+        self._outcomes.append(hedged)
+        self._hedged_in_window += hedged
+
+    async def run(
+        self,
+        endpoint: str,
+        attempt: Callable[[], Awaitable[ClientResponse]],
+        hedge_attempt: Optional[Callable[[], Awaitable[ClientResponse]]] = None
+    ) -> ClientResponse:
+        """Run an attempt, hedging it with a second one when it is slow and the budget allows.
+
+        hedge_attempt sends the second attempt, e.g. after taking a rate limiter token;
+        it defaults to attempt.
+        """
+        started = time.monotonic()
+        delay = self.delay(endpoint)
+        first = asyncio.ensure_future(attempt())
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({first}, timeout=delay)
+                if len(done) == 0:
+                    if self._within_budget():
+                        return await self._race(endpoint, started, first, hedge_attempt or attempt)
+                    _LOGGER.debug(f'Hedge budget exhausted, not hedging request to {endpoint}.')
+            self._count(False)
+            response = await first
+        except asyncio.CancelledError:
+            first.cancel()
+            raise
+        self.record(endpoint, time.monotonic() - started)
+        return response
+
+    async def _race(
+        self,
+        endpoint: str,
+        started: float,
+        first: asyncio.Future,
+        hedge_attempt: Callable[[], Awaitable[ClientResponse]]
+    ) -> ClientResponse:
+        """Send a hedge next to a slow first attempt, returning the first successful response"""
+        self.hedged += 1
+        self._count(True)
+        _LOGGER.debug(f'Hedging request to {endpoint} after {time.monotonic() - started:.3f}s.')
+        pending = {first, asyncio.ensure_future(hedge_attempt())}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if len(winners) > 0:
+                    for loser in done:
+                        if loser is not winners[0] and loser.exception() is None:
+                            loser.result().release()
+                    self.record(endpoint, time.monotonic() - started)
+                    return winners[0].result()
+                if len(pending) == 0:
+                    return done.pop().result()
+        finally:
+            for task in pending:
+                task.cancel()
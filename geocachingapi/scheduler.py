@@ -0,0 +1,139 @@
+"""Adaptive refresh scheduling of trackables."""
+from __future__ import annotations
+
+import logging
+import time
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .const import TRACKABLE_BATCH_SIZE
+from .models import GeocachingTrackable
+from .utils import parse_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass
+class _TrackableSchedule:
+    """Class to hold the refresh schedule of one trackable"""
+    interval: float
+    next_refresh: float
+    activity: tuple
+
+class GeocachingTrackableScheduler:
+    """Class to refresh active trackables often and dormant or missing ones rarely.
+
+    Every refresh without new activity multiplies the interval of a trackable by decay,
+    up to max_interval; new activity resets it to min_interval. Trackables never seen
+    before start at an interval proportional to how long ago they were last logged.
+    Reference codes the API does not return back off the same way.
+
+    At most hourly_budget requests are spent per hour, most overdue trackables first.
+    Refreshing trackables costs one /trackables request per batch_size trackables and
+    one journey request per trackable; journeys skipped by incremental updates are
+    not refunded.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: float = 900,
+        max_interval: float = 7 * 24 * 3600,
+        missing_interval: float = 7 * 24 * 3600,
+        decay: float = 2.0,
+        dormancy_factor: float = 0.1,
+        hourly_budget: Optional[int] = None,
+        batch_size: int = TRACKABLE_BATCH_SIZE
+    ) -> None:
+        """Initialize scheduler with intervals in seconds"""
+        if min_interval <= 0:
+            raise ValueError(f"min_interval must be positive, got {min_interval}")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.missing_interval = missing_interval
+        self.decay = decay
+        self.dormancy_factor = dormancy_factor
+        self.hourly_budget = hourly_budget
+        self.batch_size = batch_size
+        self._schedules: Dict[str, _TrackableSchedule] = {}
+        self._spent: Deque[Tuple[float, int]] = deque()
+        self._spent_requests = 0
+
+    def interval(self, reference_code: str) -> Optional[float]:
+        """Get the current refresh interval of a trackable"""
+        schedule = self._schedules.get(reference_code)
+        return schedule.interval if schedule is not None else None
+
+    def due(self, reference_codes: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """Get the trackables to refresh now, within the remaining hourly budget"""
+        now = time.monotonic() if now is None else now
+        overdue = []
+        for reference_code in reference_codes:
+            schedule = self._schedules.get(reference_code)
+            if schedule is None:
+                overdue.append((float("inf"), reference_code))
+            elif schedule.next_refresh <= now:
+                overdue.append(((now - schedule.next_refresh) / schedule.interval, reference_code))
+        overdue.sort(key=lambda item: item[0], reverse=True)
+        due = [reference_code for _, reference_code in overdue]
+        if self.hourly_budget is not None:
+            while len(self._spent) > 0 and self._spent[0][0] <= now - 3600:
+                self._spent_requests -= self._spent.popleft()[1]
+            remaining = self.hourly_budget - self._spent_requests
+            count = min(len(due), max(0, remaining * self.batch_size // (self.batch_size + 1) + 1))
+            while count > 0 and self.request_cost(count) > remaining:
+                count -= 1
+            due = due[:count]
+            if count > 0:
+                self._spent.append((now, self.request_cost(count)))
+                self._spent_requests += self.request_cost(count)
+        _LOGGER.debug(f'{len(due)} of {len(overdue)} overdue trackables due for refresh.')
+        return due
+
+    def request_cost(self, count: int) -> int:
+        """Get the number of requests needed to refresh count trackables"""
+        return count + -(-count // self.batch_size)
+
+    def record(self, trackable: GeocachingTrackable, now: Optional[float] = None) -> None:
+        """Schedule the next refresh of a trackable that was just refreshed"""
+        now = time.monotonic() if now is None else now
+        activity = (
+            trackable.latest_log.reference_code if trackable.latest_log else None,
+            trackable.latest_journey.logged_date if trackable.latest_journey else None,
+        )
+        schedule = self._schedules.get(trackable.reference_code)
+        if schedule is None:
+            interval = self._initial_interval(trackable)
+        elif activity != schedule.activity:
+            interval = self.min_interval
+        else:
+            interval = min(schedule.interval * self.decay, self.max_interval)
+        if trackable.is_missing is True:
+            interval = max(interval, self.missing_interval)
+        self._schedules[trackable.reference_code] = _TrackableSchedule(interval, now + interval, activity)
+
+    def record_missing(self, reference_code: str, now: Optional[float] = None) -> None:
+        """Back off a trackable the API did not return, e.g. an invalid or removed reference code"""
+        now = time.monotonic() if now is None else now
+        schedule = self._schedules.get(reference_code)
+        if schedule is None:
+            interval, activity = self.min_interval, (None, None)
+        else:
+            interval, activity = min(schedule.interval * self.decay, self.max_interval), schedule.activity
+        self._schedules[reference_code] = _TrackableSchedule(interval, now + interval, activity)
+        _LOGGER.debug(f'Trackable {reference_code} not returned, next refresh in {interval}s.')
+
+    def _initial_interval(self, trackable: GeocachingTrackable) -> float:
+        """Get an interval proportional to the time since the trackable was last logged"""
+        dates = [
+            parse_datetime(item.logged_date) if isinstance(item.logged_date, str) else item.logged_date
+            for item in (trackable.latest_log, trackable.latest_journey)
+            if item is not None and item.logged_date is not None
+        ]
+        dates = [date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date for date in dates if date is not None]
+        if len(dates) == 0:
+            return self.min_interval
+        dormant = (datetime.now(timezone.utc) - max(dates)).total_seconds()
+        return min(max(dormant * self.dormancy_factor, self.min_interval), self.max_interval)
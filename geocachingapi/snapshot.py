@@ -0,0 +1,192 @@
+"""Compact binary snapshots of GeocachingStatus."""
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from .models import GeocachingStatus
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_MAGIC = b"GCSN"
+_VERSION = 1
+_CODEC_JSON = b"j"
+_CODEC_MSGPACK = b"m"
+_LENGTH = struct.Struct(">I")
+
+def _user_payload(user: Any) -> Dict[str, Any]:
+    """Convert a user model back to its API payload"""
+    if hasattr(user, "raw"):
+        return dict(user.raw)
+    return {
+        "referenceCode": user.reference_code,
+        "username": user.username,
+        "findCount": user.find_count,
+        "hideCount": user.hide_count,
+        "favoritePoints": user.favorite_points,
+        "souvenirCount": user.souvenir_count,
+        "awardedFavoritePoints": user.awarded_favorite_points,
+        "membershipLevelId": user.membership_level_id,
+    }
+
+def _log_payload(log: Any) -> Dict[str, Any]:
+    """Convert a trackable log model back to its API payload"""
+    if hasattr(log, "raw"):
+        return dict(log.raw)
+    payload = {
+        "referenceCode": log.reference_code,
+        "text": log.text,
+        "trackableLogType": {"name": log.log_type},
+        "loggedDate": log.logged_date,
+    }
+    if log.owner is not None:
+        payload["owner"] = _user_payload(log.owner)
+    return payload
+
+def _journey_payload(journey: Any) -> Dict[str, Any]:
+    """Convert a trackable journey model back to its API payload"""
+    if hasattr(journey, "raw"):
+        return dict(journey.raw)
+    payload = {"loggedDate": journey.logged_date}
+    if journey.coordinates is not None:
+        payload["coordinates"] = {"latitude": journey.coordinates.latitude, "longitude": journey.coordinates.longitude}
+    return payload
+
+def _trackable_payload(trackable: Any) -> Dict[str, Any]:
+    """Convert a trackable model back to its API payload"""
+    if hasattr(trackable, "raw"):
+        return dict(trackable.raw)
+    return {
+        "referenceCode": trackable.reference_code,
+        "name": trackable.name,
+        "holder": _user_payload(trackable.holder) if trackable.holder is not None else None,
+        "trackingNumber": trackable.tracking_number,
+        "kilometersTraveled": trackable.kilometers_traveled,
+        "milesTraveled": trackable.miles_traveled,
+        "currentGeocacheCode": trackable.current_geocache_code,
+        "currentGeocacheName": trackable.current_geocache_name,
+        "isMissing": trackable.is_missing,
+        "type": trackable.trackable_type,
+        "trackableLogs": [_log_payload(trackable.latest_log)] if trackable.latest_log is not None else [],
+    }
+
+@dataclass
+class GeocachingSnapshotRecord:
+    """Class to hold the snapshot of one account as API payloads"""
+    account_id: str
+    user: Dict[str, Any] = field(default_factory=dict)
+    trackables: List[Dict[str, Any]] = field(default_factory=list)
+    journeys: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_status(cls, account_id: str, status: GeocachingStatus) -> GeocachingSnapshotRecord:
+        """Create the snapshot of a status"""
+        return cls(
+            account_id,
+            user=_user_payload(status.user),
+            trackables=[_trackable_payload(trackable) for trackable in status.trackables.values()],
+            journeys={
+                reference_code: _journey_payload(trackable.latest_journey)
+                for reference_code, trackable in status.trackables.items()
+                if trackable.latest_journey is not None
+            },
+        )
+
+    def apply(self, status: GeocachingStatus) -> None:
+        """Merge the snapshot into a status through its regular update methods"""
+        status.update_user_from_dict(self.user)
+        status.update_trackables_from_dict(self.trackables)
+        for reference_code, journey in self.journeys.items():
+            if reference_code in status.trackables:
+                status.update_latest_journey(status.trackables[reference_code], status.create_journey(journey))
+
+    def to_status(self, compact: bool = False) -> GeocachingStatus:
+        """Create a new status from the snapshot"""
+        status = GeocachingStatus(compact=compact)
+        self.apply(status)
+        return status
+
+class GeocachingSnapshotWriter:
+    """Class to stream account snapshots to a binary file of zlib compressed msgpack or JSON records"""
+
+    def __init__(self, file: BinaryIO, *, use_msgpack: Optional[bool] = None, compression_level: int = 6) -> None:
+        """Initialize writer, using msgpack when installed unless use_msgpack is given"""
+        if use_msgpack is None:
+            use_msgpack = msgpack is not None
+        if use_msgpack and msgpack is None:
+            raise ImportError("msgpack is required to write msgpack snapshots")
+        self._file = file
+        self._use_msgpack = use_msgpack
+        self._compression_level = compression_level
+        self._file.write(_MAGIC + bytes([_VERSION]) + (_CODEC_MSGPACK if use_msgpack else _CODEC_JSON))
+
+    def write(self, account_id: str, status: GeocachingStatus) -> None:
+        """Append the snapshot of one account"""
+        self.write_record(GeocachingSnapshotRecord.from_status(account_id, status))
+
+    def write_record(self, record: GeocachingSnapshotRecord) -> None:
+        """Append a snapshot record"""
+        data = [record.account_id, record.user, record.trackables, record.journeys]
+        if self._use_msgpack:
+            encoded = msgpack.packb(data, use_bin_type=True)
+        else:
+            encoded = json.dumps(data, separators=(",", ":")).encode("utf8")
+        payload = zlib.compress(encoded, self._compression_level)
+        self._file.write(_LENGTH.pack(len(payload)) + payload)
+
+    def __enter__(self) -> GeocachingSnapshotWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._file.flush()
+
+class GeocachingSnapshotReader:
+    """Class to stream account snapshots from a file written by GeocachingSnapshotWriter"""
+
+    def __init__(self, file: BinaryIO) -> None:
+        """Initialize reader and validate the file header"""
+        header = file.read(len(_MAGIC) + 2)
+        if len(header) != len(_MAGIC) + 2 or header[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("Not a Geocaching status snapshot")
+        if header[len(_MAGIC)] != _VERSION:
+            raise ValueError(f"Unsupported snapshot version {header[len(_MAGIC)]}")
+        self._codec = header[len(_MAGIC) + 1:]
+        if self._codec == _CODEC_MSGPACK and msgpack is None:
+            raise ImportError("msgpack is required to read this snapshot")
+        self._file = file
+
+    def __iter__(self) -> Iterator[GeocachingSnapshotRecord]:
+        while True:
+            length = self._file.read(_LENGTH.size)
+            if len(length) == 0:
+                return
+            if len(length) != _LENGTH.size:
+                raise ValueError("Truncated snapshot")
+            size = _LENGTH.unpack(length)[0]
+            payload = self._file.read(size)
+            if len(payload) != size:
+                raise ValueError("Truncated snapshot")
+            encoded = zlib.decompress(payload)
+            if self._codec == _CODEC_MSGPACK:
+                account_id, user, trackables, journeys = msgpack.unpackb(encoded, raw=False)
+            else:
+                account_id, user, trackables, journeys = json.loads(encoded)
+            yield GeocachingSnapshotRecord(account_id, user, trackables, journeys)
+
+def export_snapshot(path: str, statuses: Dict[str, GeocachingStatus], **writer_options: Any) -> None:
+    """Write the statuses of many accounts, keyed by account id, to a snapshot file"""
+    with open(path, "wb") as file, GeocachingSnapshotWriter(file, **writer_options) as writer:
+        for account_id, status in statuses.items():
+            writer.write(account_id, status)
+
+def import_snapshot(path: str, compact: bool = False) -> Dict[str, GeocachingStatus]:
+    """Read the statuses of all accounts, keyed by account id, from a snapshot file"""
+    with open(path, "rb") as file:
+        return {record.account_id: record.to_status(compact) for record in GeocachingSnapshotReader(file)}
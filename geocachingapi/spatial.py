@@ -0,0 +1,163 @@
+"""Spatial queries over trackable and journey coordinates."""
+from __future__ import annotations
+
+import heapq
+import math
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import GeocachingStatus, GeocachingTrackableJourney
+from .utils import parse_float
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Great-circle distance in kilometers between two coordinates in degrees"""
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def _journey_position(journey: GeocachingTrackableJourney) -> Optional[Tuple[float, float]]:
+    """Get the numeric position of a journey, or None when it has no coordinates"""
+    coordinates = journey.coordinates if journey is not None else None
+    if coordinates is None:
+        return None
+    latitude = parse_float(coordinates.latitude)
+    longitude = parse_float(coordinates.longitude)
+    if latitude is None or longitude is None:
+        return None
+    return latitude, longitude
+
+def _path_length_km(latitudes: Sequence[float], longitudes: Sequence[float]) -> float:
+    """Length in kilometers of a path through the given coordinates"""
+    if len(latitudes) < 2:
+        return 0.0
+    if numpy is not None:
+        phi = numpy.radians(numpy.asarray(latitudes, dtype=float))
+        lam = numpy.radians(numpy.asarray(longitudes, dtype=float))
+        a = numpy.sin(numpy.diff(phi) / 2) ** 2 + numpy.cos(phi[:-1]) * numpy.cos(phi[1:]) * numpy.sin(numpy.diff(lam) / 2) ** 2
+        return float((2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))).sum())
+    return sum(
+        haversine_km(latitudes[index], longitudes[index], latitudes[index + 1], longitudes[index + 1])
+        for index in range(len(latitudes) - 1)
+    )
+
+def distance_traveled_km(journeys: Iterable[GeocachingTrackableJourney]) -> float:
+    """Distance in kilometers along consecutive journeys, in the order given"""
+    positions = [position for position in map(_journey_position, journeys) if position is not None]
+    return _path_length_km([position[0] for position in positions], [position[1] for position in positions])
+
+def distances_traveled_km(histories: Dict[str, Iterable[GeocachingTrackableJourney]]) -> Dict[str, float]:
+    """Distance in kilometers traveled per trackable, from journey histories keyed by reference code"""
+    return {reference_code: distance_traveled_km(journeys) for reference_code, journeys in histories.items()}
+
+class GeocachingCoordinateIndex:
+    """Index of coordinates labelled by trackable reference code, for radius and nearest queries.
+
+    Coordinates are kept in numeric arrays; distances are computed vectorized with numpy
+    when it is installed and with a plain loop otherwise. An index of journey histories
+    holds many coordinates per trackable; query it per_trackable to list each trackable
+    once, at the distance of its nearest coordinate.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty index"""
+        self.reference_codes: List[str] = []
+        self._latitudes = array("d")
+        self._longitudes = array("d")
+        self._trackables: List[str] = []
+        self._trackable_numbers: Dict[str, int] = {}
+        self._trackable_of_coordinate = array("q")
+
+    def __len__(self) -> int:
+        return len(self.reference_codes)
+
+    @classmethod
+    def from_status(cls, status: GeocachingStatus) -> GeocachingCoordinateIndex:
+        """Index the latest journey position of every trackable of a status"""
+        index = cls()
+        for reference_code, trackable in status.trackables.items():
+            index.add_journeys(reference_code, [trackable.latest_journey])
+        return index
+
+    def add(self, reference_code: str, latitude: float, longitude: float) -> None:
+        """Add one coordinate"""
+        self.reference_codes.append(reference_code)
+        self._latitudes.append(latitude)
+        self._longitudes.append(longitude)
+        number = self._trackable_numbers.get(reference_code)
+        if number is None:
+            number = self._trackable_numbers[reference_code] = len(self._trackables)
+            self._trackables.append(reference_code)
+        self._trackable_of_coordinate.append(number)
+
+    def add_journeys(self, reference_code: str, journeys: Iterable[GeocachingTrackableJourney]) -> None:
+        """Add the positions of the journeys of a trackable"""
+        for position in map(_journey_position, journeys):
+            if position is not None:
+                self.add(reference_code, *position)
+
+    def distances(self, latitude: float, longitude: float) -> Sequence[float]:
+        """Distances in kilometers from a point to every indexed coordinate, in index order"""
+        if numpy is not None:
+            phi = numpy.radians(numpy.frombuffer(self._latitudes, dtype=float))
+            lam = numpy.radians(numpy.frombuffer(self._longitudes, dtype=float))
+            phi0 = math.radians(latitude)
+            a = numpy.sin((phi - phi0) / 2) ** 2 + math.cos(phi0) * numpy.cos(phi) * numpy.sin((lam - math.radians(longitude)) / 2) ** 2
+            return 2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))
+        return [
+            haversine_km(latitude, longitude, point_latitude, point_longitude)
+            for point_latitude, point_longitude in zip(self._latitudes, self._longitudes)
+        ]
+
+    def trackable_distances(self, latitude: float, longitude: float) -> Sequence[float]:
+        """Distances in kilometers from a point to the nearest coordinate of every trackable, in order of first indexing"""
+        distances = self.distances(latitude, longitude)
+        if numpy is not None:
+            minimum = numpy.full(len(self._trackables), numpy.inf)
+            numpy.minimum.at(minimum, numpy.frombuffer(self._trackable_of_coordinate, dtype=numpy.int64), distances)
+            return minimum
+        minimum = [math.inf] * len(self._trackables)
+        for number, distance in zip(self._trackable_of_coordinate, distances):
+            if distance < minimum[number]:
+                minimum[number] = distance
+        return minimum
+
+    def _labelled_distances(self, latitude: float, longitude: float, per_trackable: bool) -> Tuple[List[str], Sequence[float]]:
+        """Get the labels and distances of all coordinates, or of all trackables when per_trackable"""
+        if per_trackable:
+            return self._trackables, self.trackable_distances(latitude, longitude)
+        return self.reference_codes, self.distances(latitude, longitude)
+
+    def within(self, latitude: float, longitude: float, radius_km: float, per_trackable: bool = False) -> List[Tuple[str, float]]:
+        """Get the (reference code, distance) of all coordinates within a radius, nearest first"""
+        labels, distances = self._labelled_distances(latitude, longitude, per_trackable)
+        if numpy is not None:
+            matches = numpy.flatnonzero(distances <= radius_km)
+            matches = matches[numpy.argsort(distances[matches], kind="stable")]
+            return [(labels[position], float(distances[position])) for position in matches]
+        matches = [(distance, position) for position, distance in enumerate(distances) if distance <= radius_km]
+        return [(labels[position], distance) for distance, position in sorted(matches)]
+
+    def nearest(self, latitude: float, longitude: float, count: int = 1, per_trackable: bool = False) -> List[Tuple[str, float]]:
+        """Get the (reference code, distance) of the nearest coordinates, nearest first"""
+        labels, distances = self._labelled_distances(latitude, longitude, per_trackable)
+        count = min(count, len(labels))
+        if count <= 0:
+            return []
+        if numpy is not None:
+            candidates = numpy.argpartition(distances, count - 1)[:count]
+            candidates = candidates[numpy.argsort(distances[candidates], kind="stable")]
+            return [(labels[position], float(distances[position])) for position in candidates]
+        nearest = heapq.nsmallest(count, enumerate(distances), key=lambda item: item[1])
+        return [(labels[position], distance) for position, distance in nearest]
@@ -0,0 +1,211 @@
+"""Local SQLite store of trackables, journeys and logs."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from .geocachingapi import GeocachingApi
+from .models import GeocachingStatus, GeocachingTrackableJourney, GeocachingTrackableLog
+from .utils import parse_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trackables (
+    reference_code TEXT PRIMARY KEY,
+    name TEXT,
+    trackable_type TEXT,
+    holder TEXT,
+    kilometers_traveled REAL,
+    current_geocache_code TEXT,
+    current_geocache_name TEXT,
+    is_missing INTEGER
+);
+CREATE TABLE IF NOT EXISTS journeys (
+    reference_code TEXT NOT NULL,
+    logged_date TEXT,
+    latitude REAL,
+    longitude REAL
+);
+-- SQLite treats NULLs as distinct in unique constraints, so missing values are compared as ''
+CREATE UNIQUE INDEX IF NOT EXISTS journeys_unique ON journeys (
+    reference_code, COALESCE(logged_date, ''), COALESCE(latitude, ''), COALESCE(longitude, '')
+);
+CREATE INDEX IF NOT EXISTS journeys_by_date ON journeys (reference_code, logged_date);
+CREATE TABLE IF NOT EXISTS logs (
+    log_reference_code TEXT PRIMARY KEY,
+    reference_code TEXT NOT NULL,
+    logged_date TEXT,
+    log_type TEXT,
+    owner TEXT,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS logs_by_date ON logs (reference_code, logged_date);
+"""
+
+def _date_text(value: Any) -> Optional[str]:
+    """Normalize a logged date to ISO 8601 text, so dates sort and compare as text"""
+    if value is None:
+        return None
+    date = value if not isinstance(value, str) else parse_datetime(value)
+    return date.isoformat() if date is not None else value
+
+class GeocachingStore:
+    """Class to persist trackable history locally and sync only what is new"""
+
+    sync_errors: Dict[str, Exception] = None
+
+    def __init__(self, path: str) -> None:
+        """Open or create the store at path"""
+        self.sync_errors = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        self._connection.close()
+
+    def __enter__(self) -> GeocachingStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def sync(self, api: GeocachingApi, reference_codes: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Fetch journeys and logs newer than the newest stored ones, returning the new record count per trackable.
+
+        Trackables that failed to sync are left out of the counts; their errors are kept in sync_errors.
+        """
+        codes = list(reference_codes if reference_codes is not None else api.settings.trackable_codes)
+        semaphore = asyncio.Semaphore(max(1, api.settings.max_concurrency))
+
+        async def sync_trackable(code: str) -> int:
+            async with semaphore:
+                return await self._sync_journeys(api, code) + await self._sync_logs(api, code)
+
+        results = await asyncio.gather(*[sync_trackable(code) for code in codes], return_exceptions=True)
+        self.sync_errors = {}
+        counts = {}
+        for code, result in zip(codes, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning(f'Syncing trackable {code} failed: {result}')
+                self.sync_errors[code] = result
+            else:
+                counts[code] = result
+        _LOGGER.debug(f'Synced {sum(counts.values())} new records for {len(counts)} of {len(codes)} trackables.')
+        return counts
+
+    async def _sync_journeys(self, api: GeocachingApi, reference_code: str) -> int:
+        newest = self.newest_journey_date(reference_code)
+        rows = []
+        async for journey in api.trackable_journeys(reference_code, prefetch=False):
+            logged_date = _date_text(journey.logged_date)
+            if newest is not None and logged_date is not None and logged_date < newest:
+                break
+            coordinates = journey.coordinates
+            rows.append((
+                reference_code,
+                logged_date,
+                float(coordinates.latitude) if coordinates and coordinates.latitude is not None else None,
+                float(coordinates.longitude) if coordinates and coordinates.longitude is not None else None,
+            ))
+        with self._connection:
+            cursor = self._connection.executemany("INSERT OR IGNORE INTO journeys VALUES (?, ?, ?, ?)", rows)
+        return cursor.rowcount
+
+    async def _sync_logs(self, api: GeocachingApi, reference_code: str) -> int:
+        newest = self.newest_log_date(reference_code)
+        rows = []
+        async for log in api.trackable_logs(reference_code, prefetch=False):
+            logged_date = _date_text(log.logged_date)
+            if newest is not None and logged_date is not None and logged_date < newest:
+                break
+            rows.append((
+                log.reference_code,
+                reference_code,
+                logged_date,
+                log.log_type,
+                log.owner.username if log.owner else None,
+                log.text,
+            ))
+        with self._connection:
+            cursor = self._connection.executemany("INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return cursor.rowcount
+
+    def save_trackables(self, status: GeocachingStatus) -> None:
+        """Store the current trackable details of a status"""
+        rows = [
+            (
+                trackable.reference_code,
+                trackable.name,
+                trackable.trackable_type,
+                trackable.holder.username if trackable.holder else None,
+                trackable.kilometers_traveled,
+                trackable.current_geocache_code,
+                trackable.current_geocache_name,
+                bool(trackable.is_missing),
+            )
+            for trackable in status.trackables.values()
+        ]
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO trackables VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def trackables(self) -> List[Dict[str, Any]]:
+        """Get the stored trackable details"""
+        cursor = self._connection.execute("SELECT * FROM trackables ORDER BY reference_code")
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def newest_journey_date(self, reference_code: str) -> Optional[str]:
+        """Get the logged date of the newest stored journey of a trackable"""
+        return self._connection.execute(
+            "SELECT MAX(logged_date) FROM journeys WHERE reference_code = ?", (reference_code,)
+        ).fetchone()[0]
+
+    def newest_log_date(self, reference_code: str) -> Optional[str]:
+        """Get the logged date of the newest stored log of a trackable"""
+        return self._connection.execute(
+            "SELECT MAX(logged_date) FROM logs WHERE reference_code = ?", (reference_code,)
+        ).fetchone()[0]
+
+    def _query_history(self, table: str, columns: str, reference_code: str, since: Optional[str], until: Optional[str]) -> sqlite3.Cursor:
+        """Select the history of a trackable from a table, newest first, optionally within a date range"""
+        query = f"SELECT {columns} FROM {table} WHERE reference_code = ?"
+        parameters = [reference_code]
+        if since is not None:
+            query += " AND logged_date >= ?"
+            parameters.append(_date_text(since))
+        if until is not None:
+            query += " AND logged_date <= ?"
+            parameters.append(_date_text(until))
+        return self._connection.execute(query + " ORDER BY logged_date DESC", parameters)
+
+    def journeys(self, reference_code: str, since: Optional[str] = None, until: Optional[str] = None) -> List[GeocachingTrackableJourney]:
+        """Get the stored journeys of a trackable, newest first, optionally within a date range"""
+        rows = self._query_history("journeys", "logged_date, latitude, longitude", reference_code, since, until)
+        journeys = []
+        for logged_date, latitude, longitude in rows:
+            data = {"loggedDate": logged_date}
+            if latitude is not None or longitude is not None:
+                data["coordinates"] = {"latitude": latitude, "longitude": longitude}
+            journeys.append(GeocachingTrackableJourney(data=data))
+        return journeys
+
+    def logs(self, reference_code: str, since: Optional[str] = None, until: Optional[str] = None) -> List[GeocachingTrackableLog]:
+        """Get the stored logs of a trackable, newest first, optionally within a date range"""
+        rows = self._query_history("logs", "log_reference_code, logged_date, log_type, owner, text", reference_code, since, until)
+        return [
+            GeocachingTrackableLog(data={
+                "referenceCode": log_reference_code,
+                "loggedDate": logged_date,
+                "trackableLogType": {"name": log_type},
+                "owner": {"username": owner},
+                "text": text,
+            })
+            for log_reference_code, logged_date, log_type, owner, text in rows
+        ]
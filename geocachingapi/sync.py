@@ -0,0 +1,164 @@
+"""Synchronous client for the Geocaching API."""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import threading
+
+from typing import Any, AsyncIterator, Awaitable, Iterator, List, Optional, TypeVar
+
+from aiohttp import ClientSession
+
+from .geocachingapi import GeocachingApi
+from .models import (
+    GeocachingChangeSet,
+    GeocachingSettings,
+    GeocachingStatus,
+    GeocachingTrackableJourney,
+    GeocachingTrackableLog
+)
+from .snapshot import GeocachingSnapshotRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class _BackgroundLoop:
+    """Class to run one event loop and client session in a daemon thread, shared by all sync clients"""
+    _lock = threading.Lock()
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _thread: Optional[threading.Thread] = None
+    _session: Optional[ClientSession] = None
+
+    @classmethod
+    def loop(cls) -> asyncio.AbstractEventLoop:
+        """Get the background loop, starting it on first use"""
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                cls._thread = threading.Thread(target=cls._loop.run_forever, name="geocachingapi-loop", daemon=True)
+                cls._thread.start()
+                atexit.register(cls.shutdown)
+                _LOGGER.debug(f'Background event loop started.')
+        return cls._loop
+
+    @classmethod
+    def run(cls, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run an awaitable on the background loop and block until it completes"""
+        loop = cls.loop()
+        if threading.current_thread() is cls._thread:
+            raise RuntimeError("Blocking calls cannot be made from the background event loop")
+
+        async def run() -> T:
+            return await awaitable
+
+        future = asyncio.run_coroutine_threadsafe(run(), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Stop the coroutine when the caller gives up on it, e.g. on a timeout
+            future.cancel()
+            raise
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Close the shared client session and stop the background loop, called at interpreter exit"""
+        with cls._lock:
+            loop, thread, session = cls._loop, cls._thread, cls._session
+            cls._loop = cls._thread = cls._session = None
+        if loop is None:
+            return
+        if session is not None and not session.closed:
+            asyncio.run_coroutine_threadsafe(session.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        _LOGGER.debug(f'Background event loop stopped.')
+
+    @classmethod
+    async def session(cls) -> ClientSession:
+        """Get the client session shared by all sync clients, to be called on the background loop"""
+        if cls._session is None or cls._session.closed:
+            cls._session = GeocachingApi.create_session()
+        return cls._session
+
+class GeocachingApiSync:
+    """Blocking client for callers without an event loop, e.g. worker threads.
+
+    All clients share one long-lived event loop in a background thread and one
+    connection pool, so calls reuse connections instead of paying for a new loop and
+    session each time. Methods may be called from many threads at once; update()
+    returns a copy of the status, so later updates never change it under the caller.
+    """
+
+    def __init__(self, *, timeout: Optional[float] = None, **api_options: Any) -> None:
+        """Initialize client, api_options are passed to GeocachingApi"""
+        self.timeout = timeout
+        self._api: GeocachingApi = _BackgroundLoop.run(self._create_api(api_options))
+
+    @staticmethod
+    async def _create_api(api_options: Any) -> GeocachingApi:
+        if api_options.get("session") is None:
+            api_options["session"] = await _BackgroundLoop.session()
+        return GeocachingApi(**api_options)
+
+    @property
+    def api(self) -> GeocachingApi:
+        """The underlying asynchronous client, to be used on the background loop only"""
+        return self._api
+
+    def update(self) -> GeocachingStatus:
+        """Update the status and return a copy of it, owned by the calling thread"""
+        return _BackgroundLoop.run(self._update(), self.timeout)
+
+    async def _update(self) -> GeocachingStatus:
+        """Update the status and copy it on the background loop, where no update can change it meanwhile"""
+        status = await self._api.update()
+        copy = GeocachingSnapshotRecord.from_status("", status).to_status(status.compact)
+        copy.changes = GeocachingChangeSet(list(status.changes.user_fields), list(status.changes.trackables))
+        copy.trackable_errors = dict(status.trackable_errors)
+        return copy
+
+    def update_settings(self, settings: GeocachingSettings) -> None:
+        """Update the Geocaching settings"""
+        _BackgroundLoop.run(self._api.update_settings(settings), self.timeout)
+
+    def trackable_journeys(self, reference_code: str, page_size: Optional[int] = None) -> List[GeocachingTrackableJourney]:
+        """Get all journeys of a trackable, newest first"""
+        return list(self.iter_trackable_journeys(reference_code, page_size))
+
+    def trackable_logs(self, reference_code: str, page_size: Optional[int] = None) -> List[GeocachingTrackableLog]:
+        """Get all logs of a trackable, newest first"""
+        return list(self.iter_trackable_logs(reference_code, page_size))
+
+    def iter_trackable_journeys(self, reference_code: str, page_size: Optional[int] = None) -> Iterator[GeocachingTrackableJourney]:
+        """Iterate all journeys of a trackable, newest first, without loading the full history"""
+        options = {"page_size": page_size} if page_size is not None else {}
+        return self._iterate(self._api.trackable_journeys(reference_code, **options))
+
+    def iter_trackable_logs(self, reference_code: str, page_size: Optional[int] = None) -> Iterator[GeocachingTrackableLog]:
+        """Iterate all logs of a trackable, newest first, without loading the full history"""
+        options = {"page_size": page_size} if page_size is not None else {}
+        return self._iterate(self._api.trackable_logs(reference_code, **options))
+
+    def _iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        """Iterate an async iterator of the background loop from the calling thread"""
+        try:
+            while True:
+                try:
+                    yield _BackgroundLoop.run(iterator.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            _BackgroundLoop.run(iterator.aclose())
+
+    def close(self) -> None:
+        """Close the client; the shared connection pool stays open for other clients"""
+        _BackgroundLoop.run(self._api.close(), self.timeout)
+
+    def __enter__(self) -> GeocachingApiSync:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,5 +1,14 @@
 """Utils for consuming the API"""
-from typing import Dict, Any, Callable, Optional
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def try_get_from_dict(data: Dict[str, Any], key: str, original_value: Any, conversion: Optional[Callable[[Any], Any]] = None) -> Any:
     """Try to get value from dict, otherwise set default value"""
@@ -12,3 +21,47 @@ def try_get_from_dict(data: Dict[str, Any], key: str, original_value: Any, conve
     if conversion is None:
         return value 
     return conversion(value)
+
+def chunk_list(items: Sequence[Any], size: int) -> Iterator[List[Any]]:
+    """Split a sequence into consecutive chunks of at most size items"""
+    for index in range(0, len(items), size):
+        yield list(items[index:index + size])
+
+def payload_fingerprint(data: Any) -> str:
+    """Create a stable fingerprint of an API payload to detect changes"""
+    serialized = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(serialized.encode("utf8")).hexdigest()
+
+_REFERENCE_CODE_SEGMENT = re.compile(r"/trackables/[^/?]+")
+
+def endpoint_template(uri: str) -> str:
+    """Reduce a request uri to its endpoint template, e.g. /trackables/{code}/journeys"""
+    path = uri.split("?", 1)[0]
+    return _REFERENCE_CODE_SEGMENT.sub("/trackables/{code}", path)
+
+_FRACTIONAL_SECONDS = re.compile(r"\.(\d+)")
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Parse an ISO 8601 date from the API, returning None when it is not a valid date"""
+    if not isinstance(value, str):
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    value = _FRACTIONAL_SECONDS.sub(lambda match: "." + match.group(1)[:6].ljust(6, "0"), value, count=1)
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+def parse_float(value: Any) -> Optional[float]:
+    """Parse a number from the API, returning None when it is not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def default_json_loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
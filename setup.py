@@ -23,7 +23,8 @@ setuptools.setup(
     url="https://github.com/Sholofly/geocachingapi-python",
     packages=setuptools.find_packages(include=["geocachingapi"]),
     license="MIT license",
-    install_requires=["aiohttp>=3.7.4,<4", "backoff>=1.9.0", "yarl"],
+    install_requires=["aiohttp>=3.7.4,<4", "backoff>=2.0.0", "yarl"],
+    extras_require={"speedups": ["orjson", "msgpack"], "spatial": ["numpy"]},
     keywords=["geocaching", "api"],
     classifiers=[
         "Development Status :: 3 - Alpha",
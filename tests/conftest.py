@@ -0,0 +1,26 @@
+"""Fixtures shared by the tests."""
+from typing import Any, Callable
+
+import pytest
+
+from benchmarks.mock_server import MockGeocachingServer
+from geocachingapi import GeocachingApi
+from geocachingapi.models import GeocachingApiEnvironment
+
+TOKEN = "token-00000001"
+
+@pytest.fixture
+def create_api() -> Callable[..., Any]:
+    """Factory creating clients of a mock server.
+
+    api_options are passed to the client, a GeocachingApi unless client names another
+    class taking the same options, e.g. GeocachingApiSync.
+    """
+    def create(server: MockGeocachingServer, token: str = TOKEN, client: type = GeocachingApi, **api_options: Any) -> Any:
+        return client(
+            environment=GeocachingApiEnvironment.Staging,
+            token=token,
+            environment_settings=server.environment_settings,
+            **api_options
+        )
+    return create
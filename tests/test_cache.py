@@ -0,0 +1,34 @@
+"""Tests for the response caches."""
+import pytest
+
+from geocachingapi import GeocachingCache, GeocachingMemoryCache, GeocachingSqliteCache
+
+URI = "/users/me"
+URL = "https://api.example.com/v1/users/me"
+
+def test_base_cache_is_abstract():
+    with pytest.raises(TypeError):
+        GeocachingCache()
+
+def test_memory_cache_expires_and_evicts():
+    cache = GeocachingMemoryCache(max_entries=2, ttls={URI: 60, "/trackables": 0})
+    cache.set("token", URL, URI, {"username": "user"})
+    cache.set("token", "other", "/trackables", [])
+    assert cache.get("token", URL, URI) == {"username": "user"}
+    assert cache.get("token", "other", "/trackables") is None
+    assert cache.get("other-token", URL, URI) is None
+    cache.set("token", "a", URI, 1)
+    cache.set("token", "b", URI, 2)
+    assert cache.get("token", URL, URI) is None
+    assert (cache.hit_count, cache.miss_count) == (1, 3)
+
+def test_sqlite_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = GeocachingSqliteCache(path)
+    cache.set("token", URL, URI, {"username": "user"})
+    cache.close()
+    cache = GeocachingSqliteCache(path)
+    assert cache.get("token", URL, URI) == {"username": "user"}
+    cache.clear()
+    assert cache.get("token", URL, URI) is None
+    cache.close()
@@ -0,0 +1,62 @@
+"""Tests for sharing identical in-flight requests."""
+import asyncio
+
+from benchmarks.mock_server import MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingSettings
+
+USER_ENDPOINT = "/v1/users/me"
+INCREMENTAL = GeocachingSettings(incremental=True)
+
+def test_concurrent_updates_share_one_refresh(create_api):
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(latency=0.05)) as server:
+            async with create_api(server) as api:
+                statuses = await asyncio.gather(*[api.update() for _ in range(5)])
+            assert server.stats.per_endpoint[USER_ENDPOINT] == 1
+            assert all(status is statuses[0] for status in statuses)
+    asyncio.run(scenario())
+
+def test_clients_with_same_token_share_requests(create_api):
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(latency=0.05)) as server:
+            async with create_api(server) as first, create_api(server) as second:
+                await asyncio.gather(first.update(), second.update())
+                assert first.token == second.token
+            assert server.stats.per_endpoint[USER_ENDPOINT] == 1
+            assert second._status.user.username == first._status.user.username
+    asyncio.run(scenario())
+
+def test_clients_with_other_tokens_do_not_share_requests(create_api):
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(latency=0.05)) as server:
+            async with create_api(server, "token-00000001") as first, create_api(server, "token-00000002") as second:
+                await asyncio.gather(first.update(), second.update())
+            assert server.stats.per_endpoint[USER_ENDPOINT] == 2
+            assert first._status.user.username != second._status.user.username
+    asyncio.run(scenario())
+
+def test_not_modified_response_is_not_shared_with_unconditional_client(create_api):
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(latency=0.05, etags=True)) as server:
+            async with create_api(server, settings=INCREMENTAL) as conditional, create_api(server) as unconditional:
+                await conditional.update()
+                seen = []
+                unconditional.add_metrics_callback(seen.append)
+                await asyncio.gather(conditional.update(), unconditional.update())
+                assert server.stats.not_modified == 1
+                assert unconditional._status.user.username == conditional._status.user.username
+                assert unconditional._status.user.username is not None
+                assert [metrics.endpoint for metrics in seen] == ["/users/me"]
+                assert seen[0].status == 200
+    asyncio.run(scenario())
+
+def test_conditional_clients_with_same_validators_share_not_modified(create_api):
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(latency=0.05, etags=True)) as server:
+            async with create_api(server, settings=INCREMENTAL) as first, create_api(server, settings=INCREMENTAL) as second:
+                await asyncio.gather(first.update(), second.update())
+                await asyncio.gather(first.update(), second.update())
+            assert server.stats.per_endpoint[USER_ENDPOINT] == 2
+            assert server.stats.not_modified == 1
+            assert second._status.user.username is not None
+    asyncio.run(scenario())
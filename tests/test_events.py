@@ -0,0 +1,85 @@
+"""Tests for the change events of GeocachingStatus."""
+import asyncio
+from typing import List
+
+import pytest
+
+from benchmarks.mock_server import MockGeocachingServer
+from geocachingapi.events import (
+    GeocachingEvent,
+    GeocachingTrackableAdded,
+    GeocachingTrackableJourneyChanged,
+    GeocachingTrackableLogged,
+    GeocachingTrackableMissingChanged,
+    GeocachingTrackableMoved,
+    GeocachingUserFieldChanged,
+)
+from geocachingapi.models import GeocachingStatus
+
+USER = {"referenceCode": "PR1", "username": "user", "findCount": 10}
+
+def trackable_payload(reference_code: str = "TB1", log_code: str = "TL1", **changes) -> dict:
+    """Create a trackable payload as returned by the API"""
+    data = {**MockGeocachingServer._trackable(reference_code), **changes}
+    data["trackableLogs"] = [{**data["trackableLogs"][0], "referenceCode": log_code}]
+    return data
+
+def received(subscription) -> List[GeocachingEvent]:
+    """Close a subscription and collect the events it still holds"""
+    async def collect():
+        subscription.close()
+        return [event async for event in subscription]
+    return asyncio.run(collect())
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_every_change_emits_its_event(compact):
+    status = GeocachingStatus(compact=compact)
+    status.update_user_from_dict(USER)
+    status.update_trackables_from_dict([trackable_payload()])
+    subscription = status.subscribe()
+
+    status.update_user_from_dict({**USER, "findCount": 11})
+    status.update_trackables_from_dict([trackable_payload("TB2")])
+    status.update_trackables_from_dict([trackable_payload(currentGeocacheCode="GC99999", currentGeocacheName="Other")])
+    status.update_trackables_from_dict([trackable_payload(currentGeocacheCode="GC99999", currentGeocacheName="Other", log_code="TL2")])
+    status.update_trackables_from_dict([trackable_payload(currentGeocacheCode="GC99999", currentGeocacheName="Other", log_code="TL2", isMissing=True)])
+    trackable = status.trackables["TB1"]
+    journey = status.create_journey({"coordinates": {"latitude": 52.0, "longitude": 4.0}, "loggedDate": "2021-06-01T12:00:00"})
+    status.update_latest_journey(trackable, journey)
+    status.update_latest_journey(trackable, journey)
+
+    assert received(subscription) == [
+        GeocachingUserFieldChanged("find_count", 10, 11),
+        GeocachingTrackableAdded("TB2"),
+        GeocachingTrackableMoved("TB1", "GC12345", "GC99999", "Other"),
+        GeocachingTrackableLogged("TB1", trackable.latest_log),
+        GeocachingTrackableMissingChanged("TB1", True),
+        GeocachingTrackableJourneyChanged("TB1", journey),
+    ]
+    assert trackable.latest_log.reference_code == "TL2"
+
+def test_full_queue_drops_new_events():
+    status = GeocachingStatus()
+    subscription = status.subscribe(maxsize=2)
+    for find_count in (1, 2, 3, 4):
+        status.update_user_from_dict({**USER, "findCount": find_count})
+    assert subscription.dropped == 4
+    assert [event.field_name for event in received(subscription)] == ["reference_code", "username"]
+
+def test_close_ends_waiting_iteration_and_unsubscribes():
+    async def scenario():
+        status = GeocachingStatus()
+        subscription = status.subscribe()
+
+        async def collect():
+            return [event async for event in subscription]
+
+        iteration = asyncio.ensure_future(asyncio.wait_for(collect(), 1))
+        await asyncio.sleep(0)
+        status.update_trackables_from_dict([trackable_payload()])
+        subscription.close()
+        subscription.close()
+        status.update_trackables_from_dict([trackable_payload("TB2")])
+        assert await iteration == [GeocachingTrackableAdded("TB1")]
+        assert status._subscriptions == []
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+"""Tests for streaming trackable journey and log histories."""
+import asyncio
+
+from benchmarks.mock_server import MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingSettings
+
+CODES = [f"TB{index:05d}" for index in range(3)]
+
+def test_incremental_client_streams_full_history_every_time(create_api):
+    async def scenario():
+        config = MockServerConfig(etags=True, journeys_per_trackable=60, logs_per_trackable=25)
+        async with MockGeocachingServer(config) as server:
+            settings = GeocachingSettings(trackables=CODES, incremental=True)
+            async with create_api(server, settings=settings) as api:
+                for _ in range(2):
+                    await api.update()
+                    journeys = [journey async for journey in api.trackable_journeys(CODES[0])]
+                    logs = [log async for log in api.trackable_logs(CODES[0])]
+                    assert (len(journeys), len(logs)) == (60, 25)
+                assert not any("skip=" in url for url in api._validators)
+            assert server.stats.not_modified > 0
+    asyncio.run(scenario())
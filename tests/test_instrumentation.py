@@ -0,0 +1,71 @@
+"""Tests for request metrics and their Prometheus export."""
+import asyncio
+import re
+
+import pytest
+
+from benchmarks.mock_server import MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingMetricsAggregator
+from geocachingapi.exceptions import GeocachingApiRateLimitError
+from geocachingapi.instrumentation import LATENCY_BUCKETS
+
+LABELS = 'method="GET",endpoint="/users/me"'
+
+def sample(exported: str, name: str, labels: str = LABELS) -> float:
+    """Get the value of one sample of an exported metric"""
+    match = re.search(rf"^geocaching_api_{name}{{{re.escape(labels)}}} (\S+)$", exported, re.MULTILINE)
+    assert match is not None, f"{name}{{{labels}}} not exported"
+    return float(match.group(1))
+
+def test_metrics_count_retries_sizes_and_latencies(create_api):
+    async def scenario():
+        config = MockServerConfig(latency=0.01, rate_limit_rate=0.3, retry_after=0.01)
+        async with MockGeocachingServer(config) as server:
+            aggregator = GeocachingMetricsAggregator()
+            calls = []
+            async with create_api(server) as api:
+                api.add_metrics_callback(aggregator)
+                api.add_metrics_callback(calls.append)
+                for _ in range(10):
+                    await api.update()
+            return server.stats, aggregator.export_prometheus(), calls
+
+    stats, exported, calls = asyncio.run(scenario())
+    retries = sum(metrics.retry_count for metrics in calls)
+    assert retries == stats.rate_limited > 0
+    assert [metrics.rate_limited for metrics in calls] == [metrics.retry_count > 0 for metrics in calls]
+    assert all(metrics.retry_wait == pytest.approx(metrics.retry_count * 0.01) for metrics in calls)
+    assert sum(metrics.response_size for metrics in calls) == stats.bytes_sent
+    assert all(metrics.status == 200 and metrics.wait_time >= 0.01 for metrics in calls)
+    assert calls[0].connect_time > 0
+
+    assert sample(exported, "request_retries_total") == retries
+    assert sample(exported, "rate_limited_total") == sum(metrics.rate_limited for metrics in calls)
+    assert sample(exported, "response_bytes_total") == stats.bytes_sent
+    assert sample(exported, "responses_total", LABELS + ',status="200"') == 10
+    assert sample(exported, "request_duration_seconds_count") == 10
+    buckets = [sample(exported, "request_duration_seconds_bucket", LABELS + f',le="{bound}"') for bound in LATENCY_BUCKETS]
+    assert buckets == sorted(buckets)
+    assert buckets[0] == 0
+    assert buckets[-1] == sample(exported, "request_duration_seconds_bucket", LABELS + ',le="+Inf"') == 10
+    expected = [sum(metrics.duration <= bound for metrics in calls) for bound in LATENCY_BUCKETS]
+    assert buckets == expected
+
+def test_metrics_record_the_error_that_exhausted_retries(create_api):
+    async def scenario():
+        config = MockServerConfig(rate_limit_rate=1.0, retry_after=0.001)
+        async with MockGeocachingServer(config) as server:
+            aggregator = GeocachingMetricsAggregator()
+            calls = []
+            async with create_api(server) as api:
+                api.add_metrics_callback(aggregator)
+                api.add_metrics_callback(calls.append)
+                with pytest.raises(GeocachingApiRateLimitError):
+                    await api.update()
+            return server.stats, aggregator.export_prometheus(), calls
+
+    stats, exported, [metrics] = asyncio.run(scenario())
+    assert metrics.retry_count == stats.rate_limited - 1
+    assert (metrics.rate_limited, metrics.error) == (True, "GeocachingApiRateLimitError")
+    assert sample(exported, "request_retries_total") == metrics.retry_count
+    assert sample(exported, "responses_total", LABELS + ',status="429"') == 1
@@ -0,0 +1,74 @@
+"""Tests for the status models."""
+import pytest
+
+from benchmarks.mock_server import MockGeocachingServer
+from geocachingapi import models
+from geocachingapi.models import GeocachingStatus
+
+USER = {"referenceCode": "PR1", "username": "user", "findCount": 10}
+
+def trackable_payload(reference_code: str = "TB1", **changes) -> dict:
+    """Create a trackable payload as returned by the API"""
+    return {**MockGeocachingServer._trackable(reference_code), **changes}
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_changes_are_detected_without_fingerprints(monkeypatch, compact):
+    def fingerprint(data):
+        raise AssertionError("payloads are only fingerprinted in incremental mode")
+
+    monkeypatch.setattr(models, "payload_fingerprint", fingerprint)
+    status = GeocachingStatus(compact=compact)
+    status.update_user_from_dict(USER)
+    status.update_trackables_from_dict([trackable_payload()])
+    assert status.changes.trackables == ["TB1"]
+
+    status.changes = models.GeocachingChangeSet()
+    status.update_user_from_dict(USER)
+    status.update_trackables_from_dict([trackable_payload()])
+    assert not status.changes.has_changes
+
+    status.update_user_from_dict({**USER, "findCount": 11})
+    status.update_trackables_from_dict([trackable_payload(currentGeocacheCode="GC99999")])
+    assert status.changes.user_fields == ["find_count"]
+    assert status.changes.trackables == ["TB1"]
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_incremental_status_skips_unchanged_payloads(compact):
+    status = GeocachingStatus(compact=compact, incremental=True)
+    status.update_user_from_dict(USER)
+    status.update_trackables_from_dict([trackable_payload("user")])
+    assert sorted(status._fingerprints) == ["user"]
+    assert status._user_fingerprint is not None
+
+    trackable = status.trackables["user"]
+    status.changes = models.GeocachingChangeSet()
+    status.update_user_from_dict(USER)
+    status.update_trackables_from_dict([trackable_payload("user")])
+    assert not status.changes.has_changes
+    assert status.trackables["user"] is trackable
+
+def test_switching_incremental_mode_forgets_fingerprints():
+    status = GeocachingStatus(incremental=True)
+    status.update_trackables_from_dict([trackable_payload(name="First")])
+    status.incremental = False
+    status.update_trackables_from_dict([trackable_payload(name="Second")])
+    status.incremental = True
+    status.update_trackables_from_dict([trackable_payload(name="First")])
+    assert status.trackables["TB1"].name == "First"
+
+def test_compact_and_regular_models_merge_payloads_alike():
+    updates = [
+        trackable_payload(),
+        trackable_payload(name=None, kilometersTraveled=None, trackableLogs=[]),
+        {key: value for key, value in trackable_payload(holder=None).items() if key not in ("trackableLogs", "type")},
+        trackable_payload(currentGeocacheCode="GC99999"),
+    ]
+    users = [USER, {**USER, "findCount": None}, {"referenceCode": "PR1", "username": None}]
+    statuses = [GeocachingStatus(), GeocachingStatus(compact=True)]
+    for trackable, user in zip(updates, users + [USER]):
+        for status in statuses:
+            status.update_trackables_from_dict([trackable])
+            status.update_user_from_dict(user)
+        regular, compact = statuses
+        assert models._trackable_state(compact.trackables["TB1"]) == models._trackable_state(regular.trackables["TB1"])
+        assert models._model_values(compact.user) == models._model_values(regular.user)
@@ -0,0 +1,104 @@
+"""Tests for polling many accounts with GeocachingApiPool."""
+import asyncio
+import random
+import time
+
+from benchmarks.mock_server import MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingApiPool
+from geocachingapi.exceptions import GeocachingApiError
+from geocachingapi.models import GeocachingApiEnvironment
+
+EXPIRED = "token-expired"
+
+def create_pool(server: MockGeocachingServer, accounts: int, **pool_options) -> GeocachingApiPool:
+    """Create a pool of the mock server with accounts account-0, account-1, ..."""
+    pool = GeocachingApiPool(
+        environment=GeocachingApiEnvironment.Staging,
+        environment_settings=server.environment_settings,
+        **pool_options
+    )
+    for index in range(accounts):
+        pool.add_account(f"account-{index}", f"token-{index:08d}")
+    return pool
+
+def test_update_all_yields_statuses_and_errors():
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(rejected_tokens=[EXPIRED])) as server:
+            async with create_pool(server, 4) as pool:
+                pool.add_account("expired", EXPIRED)
+                results = {result.account_id: result async for result in pool.update_all()}
+        assert sorted(results) == ["account-0", "account-1", "account-2", "account-3", "expired"]
+        assert isinstance(results["expired"].error, GeocachingApiError)
+        assert results["expired"].status is None
+        usernames = set()
+        for account_id, result in results.items():
+            assert result.duration > 0
+            if account_id != "expired":
+                assert result.error is None
+                usernames.add(result.status.user.username)
+        assert len(usernames) == 4
+    asyncio.run(scenario())
+
+def test_updates_stay_within_global_concurrency():
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(latency=0.02)) as server:
+            async with create_pool(server, 8, max_concurrency=3) as pool:
+                running = []
+                peak = 0
+                for api in pool.accounts.values():
+                    update = api.update
+
+                    async def counted_update(update=update):
+                        nonlocal peak
+                        running.append(None)
+                        peak = max(peak, len(running))
+                        try:
+                            return await update()
+                        finally:
+                            running.pop()
+
+                    api.update = counted_update
+                results = [result async for result in pool.update_all()]
+        assert len(results) == 8
+        assert peak == 3
+    asyncio.run(scenario())
+
+def test_jittered_delays_stay_within_bounds():
+    pool = GeocachingApiPool(environment=GeocachingApiEnvironment.Staging, poll_interval=100, jitter=0.2)
+    random.seed(1)
+    delays = [pool._next_delay() for _ in range(200)]
+    assert all(80 <= delay <= 120 for delay in delays)
+    assert max(delays) - min(delays) > 20
+
+def test_poll_streams_results_until_account_is_removed():
+    async def scenario():
+        async with MockGeocachingServer() as server:
+            async with create_pool(server, 3, poll_interval=0.05, jitter=0.2) as pool:
+                stream = pool.poll()
+                started = time.monotonic()
+                seen = {}
+                async for result in stream:
+                    seen.setdefault(result.account_id, []).append(time.monotonic() - started)
+                    if all(len(times) >= 3 for times in seen.values()) and len(seen) == 3:
+                        break
+                assert all(times[0] <= 0.05 + 0.02 for times in seen.values())
+                for times in seen.values():
+                    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+                    assert all(0.04 <= gap <= 0.15 for gap in gaps)
+
+                task = pool._tasks["account-0"]
+                pool.remove_account("account-0")
+                await asyncio.sleep(0)
+                assert task.cancelled()
+                assert "account-0" not in pool.accounts
+                for _ in range(pool._queue.qsize()):
+                    await stream.__anext__()
+                removed_at = time.monotonic()
+                later = []
+                while time.monotonic() - removed_at < 0.2:
+                    later.append((await stream.__anext__()).account_id)
+                assert "account-0" not in later
+                assert {"account-1", "account-2"} <= set(later)
+                await stream.aclose()
+                assert pool._tasks == {}
+    asyncio.run(scenario())
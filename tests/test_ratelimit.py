@@ -0,0 +1,70 @@
+"""Tests for the client-side rate limiter."""
+import asyncio
+import gc
+import time
+
+from benchmarks.mock_server import MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingApi, GeocachingRateLimiter
+from geocachingapi.models import GeocachingApiEnvironment
+
+async def fetch_journeys(api: GeocachingApi, count: int):
+    """Fetch the journeys of count trackables at once"""
+    async def journeys(code: str):
+        return [journey async for journey in api.trackable_journeys(code)]
+    return await asyncio.gather(*[journeys(f"TB{index:05d}") for index in range(count)], return_exceptions=True)
+
+def test_limiter_admits_requests_smoothly_within_server_quota(create_api):
+    async def scenario():
+        config = MockServerConfig(quota_rate=20, quota_burst=6)
+        async with MockGeocachingServer(config) as server:
+            limiter = GeocachingRateLimiter.shared("quota-account", 20, capacity=5)
+            async with create_api(server, rate_limit=20, rate_limit_key="quota-account") as api:
+                started = time.monotonic()
+                results = await fetch_journeys(api, 30)
+                elapsed = time.monotonic() - started
+            assert api._rate_limiter is limiter
+            assert not any(isinstance(result, Exception) for result in results)
+            assert server.stats.rate_limited == 0
+            assert elapsed >= (30 - 5) / 20 * 0.9
+            gaps = [later - earlier for earlier, later in zip(server.stats.admitted_at[5:], server.stats.admitted_at[6:])]
+            assert max(gaps) < 0.2
+    asyncio.run(scenario())
+
+def test_quota_is_exceeded_without_limiter(create_api):
+    async def scenario():
+        config = MockServerConfig(quota_rate=20, quota_burst=5)
+        async with MockGeocachingServer(config) as server:
+            async with create_api(server) as api:
+                await fetch_journeys(api, 30)
+            assert server.stats.rate_limited > 0
+    asyncio.run(scenario())
+
+def test_limiter_is_kept_across_token_refresh(create_api):
+    async def scenario():
+        tokens = iter(f"token-{index:08d}" for index in range(100, 200))
+
+        async def refresh():
+            return next(tokens), 0
+
+        async with MockGeocachingServer() as server:
+            async with create_api(server, rate_limit=100, rate_limit_key="refreshed-account", token_refresh_method=refresh) as api:
+                limiter = api._rate_limiter
+                await api.update()
+                await api.update()
+                assert api.token != "token-00000001"
+                assert api._rate_limiter is limiter
+                assert GeocachingRateLimiter.shared("refreshed-account", 100) is limiter
+    asyncio.run(scenario())
+
+def test_unused_limiters_are_evicted():
+    api = GeocachingApi(environment=GeocachingApiEnvironment.Staging, token="token", rate_limit=10, rate_limit_key="evicted-account")
+    assert "evicted-account" in GeocachingRateLimiter._limiters
+    del api
+    gc.collect()
+    assert "evicted-account" not in GeocachingRateLimiter._limiters
+
+def test_later_rate_replaces_shared_rate():
+    limiter = GeocachingRateLimiter.shared("reconfigured-account", 10, capacity=2)
+    assert GeocachingRateLimiter.shared("reconfigured-account", 20) is limiter
+    assert limiter.rate == 20
+    assert limiter.capacity == 2
@@ -0,0 +1,153 @@
+"""Tests for circuit breaking and request hedging."""
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.mock_server import MockEndpointFaults, MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingApi, GeocachingCircuitBreaker, GeocachingRateLimiter, GeocachingRequestHedger
+from geocachingapi.exceptions import GeocachingApiCircuitOpenError, GeocachingApiError
+
+JOURNEYS_ENDPOINT = "/v1/trackables/{code}/journeys"
+
+async def journeys(api: GeocachingApi):
+    """Fetch the full journey history of one trackable"""
+    return [journey async for journey in api.trackable_journeys("TB00001")]
+
+def test_circuit_opens_probes_and_closes(create_api):
+    async def scenario():
+        faults = MockEndpointFaults(error_rate=1.0)
+        async with MockGeocachingServer(MockServerConfig(endpoints={JOURNEYS_ENDPOINT: faults})) as server:
+            breaker = GeocachingCircuitBreaker(minimum_requests=4, failure_rate=0.5, open_duration=0.2)
+            async with create_api(server, circuit_breaker=breaker) as api:
+                host = server.environment_settings["api_host"]
+                for _ in range(4):
+                    with pytest.raises(GeocachingApiError):
+                        await journeys(api)
+                assert breaker.state(host, "/trackables/{code}/journeys") == "open"
+
+                with pytest.raises(GeocachingApiCircuitOpenError):
+                    await journeys(api)
+                assert server.stats.per_endpoint[JOURNEYS_ENDPOINT] == 4
+
+                await asyncio.sleep(0.25)
+                with pytest.raises(GeocachingApiError) as failed_probe:
+                    await journeys(api)
+                assert not isinstance(failed_probe.value, GeocachingApiCircuitOpenError)
+                assert server.stats.per_endpoint[JOURNEYS_ENDPOINT] == 5
+                assert breaker.state(host, "/trackables/{code}/journeys") == "open"
+
+                faults.error_rate = 0.0
+                await asyncio.sleep(0.25)
+                assert len(await journeys(api)) == 25
+                assert breaker.state(host, "/trackables/{code}/journeys") == "closed"
+                assert len(await journeys(api)) == 25
+    asyncio.run(scenario())
+
+def test_half_open_circuit_admits_one_probe():
+    breaker = GeocachingCircuitBreaker(minimum_requests=1, open_duration=0)
+    breaker.record("host", "/endpoint", False)
+    assert breaker.state("host", "/endpoint") == "open"
+    breaker.check("host", "/endpoint")
+    assert breaker.state("host", "/endpoint") == "half_open"
+    with pytest.raises(GeocachingApiCircuitOpenError):
+        breaker.check("host", "/endpoint")
+
+def test_released_probe_lets_another_probe_through():
+    breaker = GeocachingCircuitBreaker(minimum_requests=1, open_duration=0)
+    breaker.record("host", "/endpoint", False)
+    breaker.check("host", "/endpoint")
+    breaker.release("host", "/endpoint")
+    breaker.check("host", "/endpoint")
+    assert breaker.state("host", "/endpoint") == "half_open"
+
+async def open_circuit(api: GeocachingApi, breaker: GeocachingCircuitBreaker, faults: MockEndpointFaults) -> None:
+    """Open the journeys circuit and wait until it lets a probe through"""
+    faults.error_rate = 1.0
+    with pytest.raises(GeocachingApiError):
+        await journeys(api)
+    faults.error_rate = 0.0
+    await asyncio.sleep(breaker.open_duration)
+
+def test_probe_ending_without_outcome_does_not_block_circuit(create_api, monkeypatch):
+    async def scenario():
+        faults = MockEndpointFaults()
+        async with MockGeocachingServer(MockServerConfig(endpoints={JOURNEYS_ENDPOINT: faults})) as server:
+            breaker = GeocachingCircuitBreaker(minimum_requests=1, open_duration=0.05)
+            host = server.environment_settings["api_host"]
+            async with create_api(server, circuit_breaker=breaker, rate_limit=1000) as api:
+                await open_circuit(api, breaker, faults)
+                faults.slow_next = 1
+                faults.slow_latency = 1.0
+                probe = asyncio.ensure_future(journeys(api))
+                await asyncio.sleep(0.05)
+                for in_flight, _ in list(GeocachingApi._in_flight.values()):
+                    in_flight.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await probe
+                assert breaker.state(host, "/trackables/{code}/journeys") == "half_open"
+
+                async def failing_acquire(self):
+                    raise RuntimeError("limiter failed")
+
+                with monkeypatch.context() as patch:
+                    patch.setattr(GeocachingRateLimiter, "acquire", failing_acquire)
+                    with pytest.raises(RuntimeError):
+                        await journeys(api)
+                assert len(await journeys(api)) == 25
+                assert breaker.state(host, "/trackables/{code}/journeys") == "closed"
+    asyncio.run(scenario())
+
+@pytest.fixture
+def tokens(monkeypatch):
+    """Count the rate limiter tokens taken and not given back"""
+    taken = []
+    acquire = GeocachingRateLimiter.acquire
+    release = GeocachingRateLimiter.release
+
+    async def counting_acquire(self):
+        await acquire(self)
+        taken.append(self)
+
+    def counting_release(self):
+        release(self)
+        taken.remove(self)
+
+    monkeypatch.setattr(GeocachingRateLimiter, "acquire", counting_acquire)
+    monkeypatch.setattr(GeocachingRateLimiter, "release", counting_release)
+    return taken
+
+def test_hedge_wins_over_slow_attempt(create_api, tokens):
+    async def scenario():
+        faults = MockEndpointFaults(latency=0.02)
+        async with MockGeocachingServer(MockServerConfig(endpoints={JOURNEYS_ENDPOINT: faults})) as server:
+            hedger = GeocachingRequestHedger(min_samples=5, budget=0.5)
+            async with create_api(server, hedger=hedger, rate_limit=1000) as api:
+                for _ in range(10):
+                    await journeys(api)
+                faults.slow_next = 1
+                faults.slow_latency = 0.5
+                started = time.monotonic()
+                assert len(await journeys(api)) == 25
+                assert time.monotonic() - started < 0.3
+            assert hedger.hedged >= 1
+            assert server.stats.per_endpoint[JOURNEYS_ENDPOINT] == len(tokens)
+    asyncio.run(scenario())
+
+def test_hedging_stays_within_budget(create_api, tokens):
+    async def scenario():
+        faults = MockEndpointFaults(latency=0.01)
+        async with MockGeocachingServer(MockServerConfig(endpoints={JOURNEYS_ENDPOINT: faults})) as server:
+            hedger = GeocachingRequestHedger(min_samples=5, budget=0.1)
+            async with create_api(server, hedger=hedger, rate_limit=1000) as api:
+                for _ in range(20):
+                    await journeys(api)
+                hedged = hedger.hedged
+                faults.slow_rate = 1.0
+                faults.slow_latency = 0.05
+                for _ in range(10):
+                    await journeys(api)
+            assert hedger.hedged - hedged >= 1
+            assert hedger.hedged <= 0.1 * 30
+            assert server.stats.per_endpoint[JOURNEYS_ENDPOINT] == len(tokens)
+    asyncio.run(scenario())
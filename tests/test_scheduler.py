@@ -0,0 +1,90 @@
+"""Tests for the adaptive trackable refresh scheduler."""
+import asyncio
+
+import pytest
+
+from benchmarks.mock_server import MockEndpointFaults, MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingSettings, GeocachingTrackableScheduler
+from geocachingapi.models import GeocachingTrackable
+
+def create_trackable(reference_code: str, log_code: str, is_missing: bool = False) -> GeocachingTrackable:
+    """Create a trackable with one latest log"""
+    data = MockGeocachingServer._trackable(reference_code)
+    data["trackableLogs"][0]["referenceCode"] = log_code
+    data["isMissing"] = is_missing
+    trackable = GeocachingTrackable()
+    trackable.update_from_dict(data)
+    return trackable
+
+def create_scheduler(**options) -> GeocachingTrackableScheduler:
+    """Create a scheduler with short intervals"""
+    return GeocachingTrackableScheduler(
+        min_interval=10, max_interval=100, missing_interval=1000, decay=2, dormancy_factor=0, **options
+    )
+
+def test_intervals_decay_without_activity_and_reset_on_activity():
+    scheduler = create_scheduler()
+    scheduler.record(create_trackable("TB1", "TL1"), now=0)
+    assert scheduler.interval("TB1") == 10
+    scheduler.record(create_trackable("TB1", "TL1"), now=10)
+    scheduler.record(create_trackable("TB1", "TL1"), now=30)
+    assert scheduler.interval("TB1") == 40
+    scheduler.record(create_trackable("TB1", "TL2"), now=70)
+    assert scheduler.interval("TB1") == 10
+    scheduler.record(create_trackable("TB2", "TL3", is_missing=True), now=0)
+    assert scheduler.interval("TB2") == 1000
+
+def test_due_orders_new_and_most_overdue_first():
+    scheduler = create_scheduler()
+    scheduler.record(create_trackable("TB1", "TL1"), now=0)
+    scheduler.record(create_trackable("TB2", "TL2"), now=0)
+    scheduler.record(create_trackable("TB2", "TL2"), now=10)
+    assert scheduler.due(["TB1", "TB2", "TB3"], now=5) == ["TB3"]
+    assert scheduler.due(["TB1", "TB2", "TB3"], now=29) == ["TB3", "TB1"]
+
+def test_codes_not_returned_back_off():
+    scheduler = create_scheduler()
+    scheduler.record_missing("TBGONE", now=0)
+    assert scheduler.due(["TBGONE"], now=5) == []
+    assert scheduler.due(["TBGONE"], now=10) == ["TBGONE"]
+    scheduler.record_missing("TBGONE", now=10)
+    assert scheduler.interval("TBGONE") == 20
+
+def test_budget_counts_batch_and_journey_requests():
+    scheduler = create_scheduler(hourly_budget=7, batch_size=2)
+    codes = [f"TB{index}" for index in range(10)]
+    assert scheduler.request_cost(4) == 6
+    assert scheduler.due(codes, now=0) == codes[:4]
+    assert scheduler.due(codes, now=1) == []
+    assert len(scheduler.due(codes, now=3600)) == 4
+
+def test_update_backs_off_trackables_the_api_does_not_return(create_api):
+    async def scenario():
+        codes = ["TB00001", "TB00002", "TBGONE"]
+        async with MockGeocachingServer(MockServerConfig(unknown_trackables=["TBGONE"])) as server:
+            scheduler = create_scheduler(hourly_budget=100)
+            async with create_api(server, settings=GeocachingSettings(trackables=codes), scheduler=scheduler) as api:
+                status = await api.update()
+                assert sorted(status.trackables) == codes[:2]
+                assert scheduler.interval("TBGONE") == 10
+                assert scheduler.due(codes) == []
+                await api.update()
+            assert server.stats.per_endpoint["/v1/trackables"] == 1
+    asyncio.run(scenario())
+
+def test_min_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        GeocachingTrackableScheduler(min_interval=0)
+
+def test_update_without_due_trackables_clears_previous_errors(create_api):
+    async def scenario():
+        faults = MockEndpointFaults(fail_next=1)
+        config = MockServerConfig(endpoints={"/v1/trackables/{code}/journeys": faults})
+        async with MockGeocachingServer(config) as server:
+            scheduler = create_scheduler()
+            settings = GeocachingSettings(trackables=["TB00001"])
+            async with create_api(server, settings=settings, scheduler=scheduler) as api:
+                assert list((await api.update()).trackable_errors) == ["TB00001"]
+                assert scheduler.due(settings.trackable_codes) == []
+                assert (await api.update()).trackable_errors == {}
+    asyncio.run(scenario())
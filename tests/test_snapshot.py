@@ -0,0 +1,83 @@
+"""Tests for binary status snapshots."""
+import asyncio
+import io
+
+import pytest
+
+from benchmarks.mock_server import MockGeocachingServer
+from geocachingapi import GeocachingSettings, GeocachingSnapshotReader, GeocachingSnapshotRecord, GeocachingSnapshotWriter
+from geocachingapi.models import GeocachingStatus, _model_values, _trackable_state
+from geocachingapi.snapshot import export_snapshot, import_snapshot
+
+CODES = [f"TB{index:05d}" for index in range(5)]
+JOURNEYS_ENDPOINT = "/v1/trackables/{code}/journeys"
+
+def settings(compact: bool = False) -> GeocachingSettings:
+    """Create the settings of an incremental client"""
+    return GeocachingSettings(trackables=CODES, incremental=True, compact_models=compact)
+
+def assert_same_status(restored: GeocachingStatus, status: GeocachingStatus) -> None:
+    """Check that two statuses hold the same user, trackables and journeys"""
+    assert _model_values(restored.user) == _model_values(status.user)
+    assert sorted(restored.trackables) == sorted(status.trackables)
+    for reference_code, trackable in status.trackables.items():
+        copy = restored.trackables[reference_code]
+        assert _trackable_state(copy) == _trackable_state(trackable)
+        assert copy.latest_log.logged_date == trackable.latest_log.logged_date
+        assert copy.latest_journey.logged_date == trackable.latest_journey.logged_date
+        assert copy.latest_journey.coordinates.latitude == trackable.latest_journey.coordinates.latitude
+
+async def update_statuses(create_api):
+    """Update one regular and one compact status from the mock server"""
+    async with MockGeocachingServer() as server:
+        async with create_api(server, settings=settings()) as regular, create_api(server, settings=settings(True)) as compact:
+            return {"regular": await regular.update(), "compact": await compact.update()}
+
+@pytest.mark.parametrize("use_msgpack", [False, True])
+def test_snapshot_round_trip(tmp_path, create_api, use_msgpack):
+    if use_msgpack:
+        pytest.importorskip("msgpack")
+    statuses = asyncio.run(update_statuses(create_api))
+    path = str(tmp_path / "snapshot.bin")
+    export_snapshot(path, statuses, use_msgpack=use_msgpack)
+    restored = import_snapshot(path)
+    assert sorted(restored) == ["compact", "regular"]
+    assert_same_status(restored["regular"], statuses["regular"])
+    assert_same_status(import_snapshot(path, compact=True)["compact"], statuses["compact"])
+
+def test_restored_client_skips_unchanged_journeys(create_api):
+    async def scenario():
+        async with MockGeocachingServer() as server:
+            async with create_api(server, settings=settings()) as api:
+                status = await api.update()
+            file = io.BytesIO()
+            with GeocachingSnapshotWriter(file, use_msgpack=False) as writer:
+                writer.write("account", status)
+            file.seek(0)
+            record = next(iter(GeocachingSnapshotReader(file)))
+            requests = server.stats.per_endpoint[JOURNEYS_ENDPOINT]
+
+            async with create_api(server, settings=settings()) as api:
+                assert_same_status(api.restore(record), status)
+                await api.update()
+            assert server.stats.per_endpoint[JOURNEYS_ENDPOINT] == requests
+    asyncio.run(scenario())
+
+def test_reader_rejects_other_and_truncated_files():
+    with pytest.raises(ValueError):
+        GeocachingSnapshotReader(io.BytesIO(b"not a snapshot"))
+    file = io.BytesIO()
+    GeocachingSnapshotWriter(file, use_msgpack=False).write("account", GeocachingStatus())
+    for length in (len(file.getvalue()) - 1, len(file.getvalue()) - 2):
+        with pytest.raises(ValueError):
+            list(GeocachingSnapshotReader(io.BytesIO(file.getvalue()[:length])))
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_journey_without_coordinates_round_trips(compact):
+    status = GeocachingStatus(compact=compact)
+    status.update_trackables_from_dict([MockGeocachingServer._trackable("TB1")])
+    trackable = status.trackables["TB1"]
+    status.update_latest_journey(trackable, status.create_journey({"loggedDate": "2021-06-01T10:00:00"}))
+    restored = GeocachingSnapshotRecord.from_status("account", status).to_status(compact)
+    assert restored.trackables["TB1"].latest_journey.coordinates is None
+    assert restored.trackables["TB1"].latest_journey.logged_date == trackable.latest_journey.logged_date
@@ -0,0 +1,38 @@
+"""Tests for spatial queries over trackable coordinates."""
+import pytest
+
+from geocachingapi import GeocachingCoordinateIndex, spatial
+
+@pytest.fixture(params=["numpy", "python"])
+def index(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(spatial, "numpy", None)
+    index = GeocachingCoordinateIndex()
+    for latitude in (52.0, 52.1, 52.2):
+        index.add("TB1", latitude, 4.0)
+    index.add("TB2", 52.05, 4.0)
+    index.add("TB3", 40.0, 4.0)
+    return index
+
+def test_within_lists_every_coordinate_by_default(index):
+    matches = index.within(52.0, 4.0, 50)
+    assert [code for code, _ in matches] == ["TB1", "TB2", "TB1", "TB1"]
+
+def test_within_per_trackable_keeps_the_nearest_coordinate(index):
+    matches = index.within(52.2, 4.0, 50, per_trackable=True)
+    assert [code for code, _ in matches] == ["TB1", "TB2"]
+    assert matches[0][1] == pytest.approx(0.0)
+    assert matches[1][1] == pytest.approx(spatial.haversine_km(52.2, 4.0, 52.05, 4.0))
+
+def test_nearest_per_trackable_lists_distinct_trackables(index):
+    assert [code for code, _ in index.nearest(52.0, 4.0, 2)] == ["TB1", "TB2"]
+    assert [code for code, _ in index.nearest(52.1, 4.0, 3)] == ["TB1", "TB2", "TB1"]
+    assert [code for code, _ in index.nearest(52.1, 4.0, 3, per_trackable=True)] == ["TB1", "TB2", "TB3"]
+    assert len(index.nearest(52.1, 4.0, 10, per_trackable=True)) == 3
+
+def test_empty_index():
+    index = GeocachingCoordinateIndex()
+    assert index.within(52.0, 4.0, 10, per_trackable=True) == []
+    assert index.nearest(52.0, 4.0, 3, per_trackable=True) == []
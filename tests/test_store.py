@@ -0,0 +1,70 @@
+"""Tests for the local trackable history store."""
+import asyncio
+
+from benchmarks.mock_server import MockEndpointFaults, MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingSettings, GeocachingStore
+
+CODES = [f"TB{index:05d}" for index in range(10)]
+JOURNEYS_ENDPOINT = "/v1/trackables/{code}/journeys"
+LOGS_ENDPOINT = "/v1/trackables/{code}/trackablelogs"
+
+def test_sync_fetches_only_new_history(tmp_path, create_api):
+    async def scenario():
+        config = MockServerConfig(journeys_per_trackable=12, logs_per_trackable=120)
+        async with MockGeocachingServer(config) as server:
+            with GeocachingStore(str(tmp_path / "store.db")) as store:
+                async with create_api(server, settings=GeocachingSettings(trackables=CODES)) as api:
+                    counts = await store.sync(api, CODES[:2])
+                    assert counts == {CODES[0]: 132, CODES[1]: 132}
+                    assert server.stats.per_endpoint[LOGS_ENDPOINT] == 6
+
+                    counts = await store.sync(api, CODES[:2])
+                    assert counts == {CODES[0]: 0, CODES[1]: 0}
+                    assert server.stats.per_endpoint[LOGS_ENDPOINT] == 6 + 2
+                    assert server.stats.per_endpoint[JOURNEYS_ENDPOINT] == 2 + 2
+
+                logs = store.logs(CODES[0])
+                assert len(logs) == 120
+                assert logs[0].logged_date > logs[-1].logged_date
+                assert len(store.logs(CODES[0], since="2021-05-30", until="2021-06-01")) == 2
+    asyncio.run(scenario())
+
+def test_sync_collects_errors_per_trackable(tmp_path, create_api):
+    async def scenario():
+        faults = MockEndpointFaults(error_rate=0.5)
+        config = MockServerConfig(endpoints={"/v1/trackables/{code}/journeys": faults})
+        async with MockGeocachingServer(config) as server:
+            with GeocachingStore(str(tmp_path / "store.db")) as store:
+                async with create_api(server, settings=GeocachingSettings(trackables=CODES)) as api:
+                    counts = await store.sync(api)
+                assert 0 < len(store.sync_errors) < len(CODES)
+                assert set(counts).isdisjoint(store.sync_errors)
+                assert sorted([*counts, *store.sync_errors]) == CODES
+                assert all(count == 50 for count in counts.values())
+    asyncio.run(scenario())
+
+def test_journeys_without_coordinates_or_date_are_stored_once(tmp_path, create_api, monkeypatch):
+    journey = MockGeocachingServer._journey
+
+    def incomplete_journey(code: str, index: int) -> dict:
+        data = journey(code, index)
+        if index == 0:
+            del data["coordinates"]
+        elif index == 1:
+            data["loggedDate"] = None
+        return data
+
+    monkeypatch.setattr(MockGeocachingServer, "_journey", staticmethod(incomplete_journey))
+
+    async def scenario():
+        config = MockServerConfig(journeys_per_trackable=12, logs_per_trackable=0)
+        async with MockGeocachingServer(config) as server:
+            with GeocachingStore(str(tmp_path / "store.db")) as store:
+                async with create_api(server, settings=GeocachingSettings(trackables=CODES)) as api:
+                    assert await store.sync(api, CODES[:1]) == {CODES[0]: 12}
+                    assert await store.sync(api, CODES[:1]) == {CODES[0]: 0}
+                journeys = store.journeys(CODES[0])
+                assert len(journeys) == 12
+                assert journeys[0].coordinates is None
+                assert journeys[-1].logged_date is None
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+"""Tests for the synchronous client."""
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from benchmarks.mock_server import MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingApiSync, GeocachingSettings
+from geocachingapi.sync import _BackgroundLoop
+
+CODES = [f"TB{index:05d}" for index in range(5)]
+
+@pytest.fixture
+def server():
+    server = MockGeocachingServer(MockServerConfig(latency=0.02))
+    _BackgroundLoop.run(server.start())
+    yield server
+    _BackgroundLoop.run(server.stop())
+
+@pytest.fixture
+def create_client(create_api):
+    """Factory creating sync clients of the mock server"""
+    def create(server: MockGeocachingServer) -> GeocachingApiSync:
+        return create_api(server, client=GeocachingApiSync, settings=GeocachingSettings(trackables=CODES), timeout=10)
+    return create
+
+def test_updates_from_many_threads_share_requests_and_get_copies(server, create_client):
+    with create_client(server) as client:
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            statuses = list(executor.map(lambda _: client.update(), range(8)))
+        assert server.stats.per_endpoint["/v1/users/me"] < len(statuses)
+        for status in statuses:
+            assert status is not client.api._status
+            assert status.user.username == client.api._status.user.username
+            assert sorted(status.trackables) == CODES
+            assert status.trackables[CODES[0]] is not client.api._status.trackables[CODES[0]]
+            assert status.trackables[CODES[0]].latest_journey == client.api._status.trackables[CODES[0]].latest_journey
+
+def test_history_is_returned_as_lists_and_iterators(server, create_client):
+    with create_client(server) as client:
+        assert len(client.trackable_journeys(CODES[0])) == 25
+        journeys = client.iter_trackable_journeys(CODES[0], page_size=10)
+        assert next(journeys).logged_date is not None
+        journeys.close()
+
+def test_timed_out_call_is_cancelled():
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        _BackgroundLoop.run(slow(), timeout=0.05)
+    assert cancelled.wait(1)
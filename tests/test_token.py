@@ -0,0 +1,77 @@
+"""Tests for refreshing the API token."""
+import asyncio
+
+import pytest
+
+from benchmarks.mock_server import MockGeocachingServer, MockServerConfig
+from geocachingapi.const import TOKEN_REFRESH_MARGIN
+from geocachingapi.exceptions import GeocachingApiError
+
+EXPIRED = "token-expired"
+
+class Refresher:
+    """Token refresh method handing out the given tokens in turn, counting its calls"""
+
+    def __init__(self, *tokens: str, expires_in: float = 3600, delay: float = 0) -> None:
+        self.tokens = list(tokens)
+        self.expires_in = expires_in
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.tokens[min(self.calls, len(self.tokens)) - 1], self.expires_in
+
+async def journeys(api, count: int = 5):
+    """Fetch the journey histories of count trackables at once"""
+    async def history(code: str):
+        return [journey async for journey in api.trackable_journeys(code)]
+    return await asyncio.gather(*[history(f"TB{index:05d}") for index in range(count)])
+
+def test_token_is_refreshed_only_near_expiry(create_api):
+    async def scenario():
+        async with MockGeocachingServer() as server:
+            refresher = Refresher("token-00000002", "token-00000003", expires_in=TOKEN_REFRESH_MARGIN + 0.2)
+            async with create_api(server, token_refresh_method=refresher) as api:
+                for _ in range(3):
+                    await api.update()
+                assert (refresher.calls, api.token) == (1, "token-00000002")
+                await asyncio.sleep(0.25)
+                await api.update()
+                await api.update()
+                assert (refresher.calls, api.token) == (2, "token-00000003")
+    asyncio.run(scenario())
+
+def test_unauthorized_response_refreshes_and_retries_once(create_api):
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(rejected_tokens=[EXPIRED])) as server:
+            refresher = Refresher(EXPIRED, "token-00000002")
+            async with create_api(server, token_refresh_method=refresher) as api:
+                await api.update()
+                assert (refresher.calls, api.token) == (2, "token-00000002")
+                assert (server.stats.unauthorized, server.stats.requests) == (1, 2)
+
+            refresher = Refresher(EXPIRED)
+            async with create_api(server, token_refresh_method=refresher) as api:
+                with pytest.raises(GeocachingApiError) as rejected:
+                    await api.update()
+                assert rejected.value.args[0] == 401
+                assert refresher.calls == 2
+                assert (server.stats.unauthorized, server.stats.requests) == (3, 4)
+    asyncio.run(scenario())
+
+def test_concurrent_requests_share_one_refresh(create_api):
+    async def scenario():
+        async with MockGeocachingServer(MockServerConfig(rejected_tokens=[EXPIRED])) as server:
+            refresher = Refresher("token-00000002", delay=0.05)
+            async with create_api(server, token_refresh_method=refresher) as api:
+                await journeys(api)
+                assert refresher.calls == 1
+
+            refresher = Refresher(EXPIRED, "token-00000002", delay=0.05)
+            async with create_api(server, token_refresh_method=refresher) as api:
+                assert all(len(history) == 25 for history in await journeys(api))
+                assert refresher.calls == 2
+                assert server.stats.unauthorized == 5
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+"""Tests for updating trackables in batches."""
+import asyncio
+
+from benchmarks.mock_server import MockEndpointFaults, MockGeocachingServer, MockServerConfig
+from geocachingapi import GeocachingSettings
+from geocachingapi.const import TRACKABLE_BATCH_SIZE
+from geocachingapi.exceptions import GeocachingApiError
+
+TRACKABLES_ENDPOINT = "/v1/trackables"
+JOURNEYS_ENDPOINT = "/v1/trackables/{code}/journeys"
+
+def codes(count: int):
+    """Create count trackable reference codes"""
+    return [f"TB{index:05d}" for index in range(count)]
+
+def test_trackables_are_requested_in_batches(create_api):
+    async def scenario():
+        async with MockGeocachingServer() as server:
+            settings = GeocachingSettings(trackables=codes(2 * TRACKABLE_BATCH_SIZE + 20))
+            async with create_api(server, settings=settings) as api:
+                status = await api.update()
+            assert sorted(status.trackables) == settings.trackable_codes
+            assert server.stats.per_endpoint[TRACKABLES_ENDPOINT] == 3
+            assert status.trackable_errors == {}
+    asyncio.run(scenario())
+
+def test_paging_stops_at_limit(create_api):
+    async def scenario():
+        async with MockGeocachingServer() as server:
+            async with create_api(server) as api:
+                uri = f"/trackables?referenceCodes={','.join(codes(50))}"
+                assert len(await api._request_paged(uri, take=20)) == 50
+                assert server.stats.per_endpoint[TRACKABLES_ENDPOINT] == 3
+                assert len(await api._request_paged(uri, take=20, limit=40)) == 40
+                assert server.stats.per_endpoint[TRACKABLES_ENDPOINT] == 3 + 2
+                assert len(await api._request_paged(uri, take=50, limit=50)) == 50
+                assert server.stats.per_endpoint[TRACKABLES_ENDPOINT] == 3 + 2 + 1
+    asyncio.run(scenario())
+
+def test_failed_batch_is_reported_per_trackable(create_api):
+    async def scenario():
+        faults = MockEndpointFaults(fail_next=1)
+        async with MockGeocachingServer(MockServerConfig(endpoints={TRACKABLES_ENDPOINT: faults})) as server:
+            settings = GeocachingSettings(trackables=codes(2 * TRACKABLE_BATCH_SIZE))
+            async with create_api(server, settings=settings) as api:
+                status = await api.update()
+                assert status.user.username is not None
+                assert len(status.trackables) == TRACKABLE_BATCH_SIZE
+                assert sorted([*status.trackables, *status.trackable_errors]) == settings.trackable_codes
+                assert all(isinstance(error, GeocachingApiError) for error in status.trackable_errors.values())
+
+                status = await api.update()
+                assert len(status.trackables) == 2 * TRACKABLE_BATCH_SIZE
+                assert status.trackable_errors == {}
+    asyncio.run(scenario())
+
+def test_failed_journey_is_reported_per_trackable(create_api):
+    async def scenario():
+        faults = MockEndpointFaults(fail_next=2)
+        async with MockGeocachingServer(MockServerConfig(endpoints={JOURNEYS_ENDPOINT: faults})) as server:
+            async with create_api(server, settings=GeocachingSettings(trackables=codes(6))) as api:
+                status = await api.update()
+            assert len(status.trackables) == 6
+            assert len(status.trackable_errors) == 2
+            for reference_code, trackable in status.trackables.items():
+                failed = reference_code in status.trackable_errors
+                assert (trackable.latest_journey is None) == failed
+    asyncio.run(scenario())